@@ -95,8 +95,8 @@ async def async_main():
         try:
             cache = RedisCache(host=redis_host, port=redis_port, password=redis_password)
             structured_logger.info("Redis cache initialized",
-                "host", redis_host,
-                "port", redis_port)
+                host=redis_host,
+                port=redis_port)
         except Exception as e:
             logger.warning(f"Failed to initialize Redis cache: {e}")
             cache = None
@@ -243,10 +243,7 @@ async def async_main():
                         notifier = TelegramNotifier(bot_token=telegram_token, parse_mode=None)
 
                         chat_ids = [user.chat_id for user in users]
-                        results = {}
-                        for chat_id in chat_ids:
-                            success = notifier.send_themes_separately(chat_id, narratives, len(news_items), analysis_date, clustering_metrics)
-                            results[chat_id] = success
+                        results = notifier.send_themes_separately_to_all(chat_ids, narratives, len(news_items), analysis_date, clustering_metrics)
 
                         successful = sum(1 for success in results.values() if success)
                         failed = len(results) - successful
@@ -410,8 +407,8 @@ def main():
         try:
             cache = RedisCache(host=redis_host, port=redis_port, password=redis_password)
             structured_logger.info("Redis cache initialized",
-                "host", redis_host,
-                "port", redis_port)
+                host=redis_host,
+                port=redis_port)
         except Exception as e:
             logger.warning(f"Failed to initialize Redis cache: {e}")
             cache = None
@@ -545,48 +542,41 @@ def main():
                 max_features = min(settings.max_features, 5000)  # Ограничиваем до 5k признаков для экономии памяти
                 logger.info(f"Используем max_features={max_features}")
 
+                # Векторизатор сам читает и пишет кэш векторов (1 час) под ключом
+                # из хэша текстов и параметров векторизации
                 vectorizer = TextVectorizer(
                     max_features=max_features,
                     min_df=settings.min_df,
-                    max_df=settings.max_df
+                    max_df=settings.max_df,
+                    use_hashing=settings.use_hashing,
+                    cache=cache,
+                    cache_ttl=3600
                 )
-                logger.info(f"Начинаем векторизацию {len(processed_texts)} текстов...")
                 logger.info(f"Векторизация {len(processed_texts)} текстов с {max_features} признаками...")
 
-                # Проверяем кэш векторов
-                vectors = None
+                # Хэш текстов считаем один раз для всех ключей кэша
+                texts_hash = cache._hash_texts(processed_texts) if cache else None
+                vectors = vectorizer.fit_transform(processed_texts, texts_hash=texts_hash)
                 if cache:
-                    vectors = cache.get_vectorized_texts(processed_texts)
-                    if vectors:
+                    if vectorizer.from_cache:
                         logger.info("Векторы получены из Redis кэша")
                         structured_logger.info("Vectors retrieved from cache",
-                            "texts_count", len(processed_texts))
+                            texts_count=len(processed_texts))
                         metrics_manager.record_cache_hit("vectors")
                     else:
                         metrics_manager.record_cache_miss("vectors")
+                if not vectorizer.from_cache:
+                    logger.info(f"Векторы созданы: форма {vectors.shape[0]}x{vectors.shape[1]}")
 
-                if vectors is None:
-                    # Векторизация если не найдено в кэше
-                    vectors = vectorizer.fit_transform(processed_texts)
-                    logger.info(f"Векторы созданы: форма {len(vectors)}x{len(vectors[0]) if vectors else 0}")
-
-                    # Сохраняем в кэш
-                    if cache and vectors:
-                        try:
-                            cache.set_vectorized_texts(processed_texts, vectors, ttl_seconds=3600)  # 1 час
-                            logger.debug("Векторы сохранены в Redis кэш")
-                        except Exception as e:
-                            logger.warning(f"Failed to cache vectors: {e}")
-
-                if not vectors or len(vectors) == 0:
+                if vectors is None or len(vectors) == 0:
                     logger.error("Векторизация вернула пустой результат!")
                     return
 
                 # Проверяем качество векторов
-                logger.info(f"Проверка векторов: тип={type(vectors)}, длина={len(vectors) if vectors else 0}")
+                logger.info(f"Проверка векторов: тип={type(vectors)}, длина={len(vectors)}")
 
                 # Оцениваем использование памяти (примерно)
-                if vectors and len(vectors) > 0 and vectors[0]:
+                if len(vectors) > 0 and len(vectors[0]) > 0:
                     estimated_memory_mb = (len(vectors) * len(vectors[0]) * 4) / (1024 * 1024)  # float32 = 4 bytes
                     logger.info(f"Оценка использования памяти векторами: {estimated_memory_mb:.1f} MB")
 
@@ -617,7 +607,8 @@ def main():
                     "metric": settings.cluster_metric
                 }
 
-                vectors_hash = cache._hash_texts(processed_texts) if cache else None
+                # Кластеры зависят от векторов, поэтому ключ включает и параметры векторизации
+                vectors_hash = vectorizer.cache_key(processed_texts, texts_hash) if cache else None
                 cached_result = None
                 if cache and vectors_hash:
                     cached_result = cache.get_clustering_result(vectors_hash, cluster_params)
@@ -628,8 +619,8 @@ def main():
                         unique_labels = cached_result["unique_labels"]
                         logger.info("Результаты кластеризации получены из Redis кэша")
                         structured_logger.info("Clustering result retrieved from cache",
-                            "clusters", n_clusters,
-                            "noise", n_noise)
+                            clusters=n_clusters,
+                            noise=n_noise)
                         metrics_manager.record_cache_hit("clusters")
                     else:
                         metrics_manager.record_cache_miss("clusters")
@@ -710,7 +701,7 @@ def main():
                     if narratives:
                         logger.info("Нарративы получены из Redis кэша")
                         structured_logger.info("Narratives retrieved from cache",
-                            "narratives_count", len(narratives))
+                            narratives_count=len(narratives))
                         metrics_manager.record_cache_hit("narratives")
                     else:
                         metrics_manager.record_cache_miss("narratives")
@@ -834,11 +825,8 @@ def main():
                         # Получаем список chat_id
                         chat_ids = [user.chat_id for user in users]
                         
-                        # Отправляем текстовое резюме всем пользователям
-                        results = {}
-                        for chat_id in chat_ids:
-                            success = notifier.send_themes_separately(chat_id, narratives, len(news_items), analysis_date, clustering_metrics)
-                            results[chat_id] = success
+                        # Отправляем темы всем пользователям (форматируются один раз)
+                        results = notifier.send_themes_separately_to_all(chat_ids, narratives, len(news_items), analysis_date, clustering_metrics)
                         
                         # Статистика отправки
                         successful = sum(1 for success in results.values() if success)
@@ -52,20 +52,20 @@ class NewsClusterer:
         self.quality_evaluator = ClusteringQualityMetrics() if evaluate_quality else None
         self.last_quality_metrics = None
     
-    def fit_predict(self, vectors: List[List[float]]) -> Tuple[List[int], int, int, List[int]]:
+    def fit_predict(self, vectors: np.ndarray) -> Tuple[List[int], int, int, List[int]]:
         """
         Выполняет продвинутую кластеризацию векторов с оценкой качества.
 
         Args:
-            vectors: Список векторов (каждый вектор - список чисел)
+            vectors: Матрица векторов (или список векторов)
 
         Returns:
             Кортеж (labels, n_clusters, n_noise, unique_labels)
         """
         logger.info(f"Продвинутая кластеризация {len(vectors)} векторов...")
 
-        # Преобразуем в numpy array с оптимизацией памяти
-        X = np.array(vectors, dtype=np.float32)
+        # Преобразуем в numpy array с оптимизацией памяти (float32 без копии)
+        X = np.asarray(vectors, dtype=np.float32)
 
         # Предварительная обработка метрики
         metric = self.metric
@@ -1,10 +1,17 @@
 """Векторизация текста с помощью TF-IDF."""
 
-from typing import List
-from sklearn.feature_extraction.text import TfidfVectorizer
+import hashlib
+import json
+from typing import List, Optional, TYPE_CHECKING
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.pipeline import make_pipeline
 
 from ..utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from ..cache.redis_cache import RedisCache
+
 logger = get_logger(__name__)
 
 
@@ -15,7 +22,10 @@ class TextVectorizer:
         self,
         max_features: int = 5000,
         min_df: int = 2,
-        max_df: float = 0.95
+        max_df: float = 0.95,
+        use_hashing: bool = False,
+        cache: Optional["RedisCache"] = None,
+        cache_ttl: int = 3600
     ):
         """
         Инициализация векторизатора.
@@ -24,40 +34,52 @@ class TextVectorizer:
             max_features: Максимальное количество признаков
             min_df: Минимальная частота документа
             max_df: Максимальная частота документа (доля)
+            use_hashing: Хэшировать признаки в max_features колонок вместо построения
+                словаря (память не растет со словарем, но min_df/max_df и названия
+                признаков недоступны)
+            cache: Redis кэш готовых векторов; при попадании TF-IDF не пересчитывается
+            cache_ttl: Время жизни векторов в кэше в секундах
         """
         self.max_features = max_features
         self.min_df = min_df
         self.max_df = max_df
+        self.use_hashing = use_hashing
+        self.cache = cache
+        self.cache_ttl = cache_ttl
         self.vectorizer = None
         self._fitted = False
+        # Получен ли результат последнего fit_transform из кэша
+        self.from_cache = False
     
-    def fit_transform(self, texts: List[str]) -> List[List[float]]:
+    def fit_transform(self, texts: List[str], texts_hash: Optional[str] = None) -> np.ndarray:
         """
         Обучает векторизатор и преобразует тексты в векторы.
         
         Args:
             texts: Список предобработанных текстов
+            texts_hash: Уже вычисленный cache._hash_texts(texts), чтобы не хэшировать тексты повторно
             
         Returns:
-            Список векторов (каждый вектор - список чисел)
+            Матрица векторов float32 формы (len(texts), число признаков)
         """
+        self.from_cache = False
+        cache_hash = None
+        if self.cache is not None:
+            cache_hash = self.cache_key(texts, texts_hash)
+            cached = self.cache.get_vectorized_texts(texts, texts_hash=cache_hash)
+            if cached is not None:
+                self.from_cache = True
+                # Сам векторизатор при этом не обучается: прежнее обучение сбрасывается,
+                # чтобы get_feature_names() не вернул словарь других текстов
+                self.vectorizer = None
+                self._fitted = False
+                logger.info(f"Векторы {len(texts)} текстов получены из кэша")
+                return np.asarray(cached, dtype=np.float32)
+
         logger.info(f"Векторизация {len(texts)} текстов...")
         
-        self.vectorizer = TfidfVectorizer(
-            max_features=self.max_features,
-            min_df=self.min_df,
-            max_df=self.max_df,
-            ngram_range=(1, 3),  # Униграммы, биграммы и триграммы для лучшего захвата контекста
-            lowercase=False,  # Уже в нижнем регистре
-            # Улучшенные параметры для русского языка
-            token_pattern=r'(?u)\b\w\w+\b',  # Улучшенный паттерн токенов
-            sublinear_tf=True,  # Логарифмическое масштабирование TF
-            use_idf=True,  # Использовать IDF
-            smooth_idf=True,  # Сглаживание IDF
-            norm='l2'  # L2 нормализация
-        )
-        
-        # Преобразуем в numpy array, затем в список списков
+        self.vectorizer = self._build_hashing() if self.use_hashing else self._build_tfidf()
+
         # Оптимизация: используем sparse matrix для экономии памяти
         vectors = self.vectorizer.fit_transform(texts)
         self._fitted = True
@@ -73,8 +95,72 @@ class TextVectorizer:
             logger.warning("Матрица очень sparse. Рассмотрите уменьшение max_features или увеличение min_df")
 
         # Преобразуем в dense для совместимости с HDBSCAN
-        # Оптимизация: используем float32 вместо float64 для экономии памяти
-        return vectors.toarray().astype('float32').tolist()
+        # Оптимизация: матрица уже float32, поэтому toarray() не создает лишней копии;
+        # матрица отдается как есть, без упаковки в списки Python
+        result = vectors.toarray().astype(np.float32, copy=False)
+
+        if cache_hash is not None:
+            self.cache.set_vectorized_texts(texts, result, ttl_seconds=self.cache_ttl, texts_hash=cache_hash)
+
+        return result
+
+    def cache_key(self, texts: List[str], texts_hash: Optional[str] = None) -> str:
+        """
+        Ключ векторов в кэше: зависит и от текстов, и от параметров векторизации.
+
+        Args:
+            texts: Список предобработанных текстов
+            texts_hash: Уже вычисленный cache._hash_texts(texts)
+
+        Returns:
+            Хэш для RedisCache.get_vectorized_texts/set_vectorized_texts
+        """
+        if texts_hash is None:
+            texts_hash = self.cache._hash_texts(texts)
+        return f"{texts_hash}_{self._params_hash()}"
+
+    def _params_hash(self) -> str:
+        """Хэш параметров векторизации для ключа кэша."""
+        params = {
+            "max_features": self.max_features,
+            "min_df": self.min_df,
+            "max_df": self.max_df,
+            "use_hashing": self.use_hashing
+        }
+        params_str = json.dumps(params, sort_keys=True)
+        return hashlib.sha256(params_str.encode()).hexdigest()[:8]
+
+    def _build_tfidf(self) -> TfidfVectorizer:
+        """Создает TF-IDF векторизатор со словарем."""
+        return TfidfVectorizer(
+            max_features=self.max_features,
+            min_df=self.min_df,
+            max_df=self.max_df,
+            ngram_range=(1, 3),  # Униграммы, биграммы и триграммы для лучшего захвата контекста
+            lowercase=False,  # Уже в нижнем регистре
+            # Улучшенные параметры для русского языка
+            token_pattern=r'(?u)\b\w\w+\b',  # Улучшенный паттерн токенов
+            sublinear_tf=True,  # Логарифмическое масштабирование TF
+            use_idf=True,  # Использовать IDF
+            smooth_idf=True,  # Сглаживание IDF
+            norm='l2',  # L2 нормализация
+            dtype=np.float32  # Разреженная матрица сразу в float32, без промежуточной float64
+        )
+    
+    def _build_hashing(self):
+        """Создает хэширующий векторизатор с IDF: фиксированное число колонок без словаря в памяти."""
+        return make_pipeline(
+            HashingVectorizer(
+                n_features=self.max_features,
+                ngram_range=(1, 3),
+                lowercase=False,
+                token_pattern=r'(?u)\b\w\w+\b',
+                alternate_sign=False,  # Только неотрицательные веса, как у TF-IDF
+                norm=None,  # Нормализация после IDF
+                dtype=np.float32
+            ),
+            TfidfTransformer(sublinear_tf=True, use_idf=True, smooth_idf=True, norm='l2')
+        )
     
     def get_feature_names(self) -> List[str]:
         """
@@ -85,4 +171,6 @@ class TextVectorizer:
         """
         if not self._fitted or self.vectorizer is None:
             raise RuntimeError("Векторизатор еще не обучен. Вызовите fit_transform() сначала.")
+        if self.use_hashing:
+            raise RuntimeError("Названия признаков недоступны при use_hashing=True.")
         return self.vectorizer.get_feature_names_out().tolist()
@@ -1,81 +1,322 @@
 """Redis caching для векторизации и кластеризации."""
 
 import json
-import pickle  # nosec - used for local ML model serialization
-from typing import Optional, Dict, Any, List
+import os
+from typing import Optional, Dict, Any, List, Callable, Sequence, Tuple
 import redis
 import hashlib
+import struct
+import threading
+import time
 from datetime import datetime, timedelta
+import numpy as np
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
 
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Сигнатура кадра zstd: по ней сжатые значения отличаются от записанных без сжатия
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# Двоичный формат векторов: сигнатура, dtype (до 8 байт), число измерений, затем форма
+# (uint64 на измерение) и сырые байты массива
+VECTORS_MAGIC = b"NAV1"
+VECTORS_HEADER = struct.Struct("<4s8sI")
+
+# Размер страницы SCAN: больше ключей за один вызов - меньше сетевых обходов
+SCAN_COUNT = 1000
+
+# Пулы соединений общие для всех экземпляров RedisCache в процессе: TCP-подключение
+# и AUTH выполняются один раз, а не при каждом создании кэша
+_POOLS: Dict[tuple, redis.ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+# Запись значения с TTL и регистрация ключа в индексе категории одной атомарной командой.
+# Индекс - ZSET с временем истечения ключа (по часам сервера) в качестве score;
+# истекшие записи индекса удаляются при каждой записи
+STORE_SCRIPT = """
+local now = tonumber(redis.call('TIME')[1])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('ZADD', KEYS[2], now + tonumber(ARGV[2]), KEYS[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+return 1
+"""
+
+# Число живых ключей в каждом индексе: истекшие записи удаляются перед подсчетом
+COUNT_SCRIPT = """
+local now = tonumber(redis.call('TIME')[1])
+local counts = {}
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+    counts[i] = redis.call('ZCARD', key)
+end
+return counts
+"""
+
+# Категории кэша, у каждой свой индекс
+INDEX_PREFIXES = ("vectors", "text_vectors", "clusters", "narratives")
+
+# Сколько секунд результат health_check считается актуальным
+HEALTH_CHECK_TTL = 5.0
+
+# UNIX-сокет Redis на той же машине (быстрее TCP через loopback). Используется только
+# если путь задан явно: сокет в общедоступном каталоге может подменить любой пользователь
+REDIS_SOCKET_PATH = os.getenv("REDIS_SOCKET_PATH") or None
+
+
+def _get_pool(host: str, port: int, db: int, password: Optional[str],
+              unix_socket_path: Optional[str] = None) -> redis.ConnectionPool:
+    """Возвращает пул соединений для адреса Redis, создавая его при первом обращении."""
+    if unix_socket_path:
+        key = ("unix", unix_socket_path, db, password)
+        address = {"connection_class": redis.UnixDomainSocketConnection, "path": unix_socket_path}
+    else:
+        key = (host, port, db, password)
+        address = {"host": host, "port": port}
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = redis.ConnectionPool(
+                db=db,
+                password=password,
+                socket_timeout=5,
+                socket_connect_timeout=5,
+                retry_on_timeout=True,
+                max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", "32")),
+                **address
+            )
+            _POOLS[key] = pool
+        return pool
+
+
+def _to_builtin(obj: Any) -> Any:
+    """Приводит numpy-типы к встроенным типам Python целиком, а не поэлементно."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
 
 class RedisCache:
     """Redis кэш для ML данных."""
 
-    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, password: str = None):
-        """Инициализация Redis клиента."""
-        self.client = redis.Redis(
-            host=host,
-            port=port,
-            db=db,
-            password=password,
-            decode_responses=False,  # Для бинарных данных
-            socket_timeout=5,
-            socket_connect_timeout=5,
-            retry_on_timeout=True,
-            max_connections=10
-        )
-        self._test_connection()
-
-    def _test_connection(self):
-        """Тестирование подключения к Redis."""
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, password: str = None,
+                 codec: Optional[str] = None, compress: bool = True,
+                 unix_socket_path: Optional[str] = None):
+        """
+        Инициализация Redis клиента.
+
+        Args:
+            codec: Формат кэша для кластеров и нарративов: "msgpack" (по умолчанию,
+                если установлен) или "json" (удобно для отладки через redis-cli)
+            compress: Сжимать значения zstd (уровень 1), если zstandard установлен
+            unix_socket_path: Путь к UNIX-сокету Redis (по умолчанию REDIS_SOCKET_PATH, если задан).
+                При неудаче - подключение по TCP
+        """
+        self._codec = codec or ("msgpack" if MSGPACK_AVAILABLE else "json")
+        self._compress_enabled = compress and ZSTD_AVAILABLE
+        # Контексты zstd не потокобезопасны, поэтому у каждого потока свои
+        self._zstd = threading.local()
+        if unix_socket_path is None:
+            unix_socket_path = REDIS_SOCKET_PATH
+
+        # Клиент создается без подключения: соединение проверяется при первой операции
+        # или первом health_check, а не в конструкторе.
+        # decode_responses=False по умолчанию - для бинарных данных
+        self._tcp_address = (host, port, db, password)
+        self._socket_fallback = bool(unix_socket_path)
+        self.client = redis.Redis(connection_pool=_get_pool(host, port, db, password, unix_socket_path))
+        self._last_check: Optional[Tuple[float, bool]] = None
+        # Скрипт вызывается через EVALSHA; тело передается серверу только при первом NOSCRIPT
+        self._store_script = self.client.register_script(STORE_SCRIPT)
+        self._count_script = self.client.register_script(COUNT_SCRIPT)
+
+    def _ping(self) -> bool:
+        """Проверка подключения к Redis; при недоступном UNIX-сокете - переход на TCP."""
         try:
             self.client.ping()
-            logger.info("Redis connection established")
-        except redis.ConnectionError as e:
-            logger.warning(f"Redis connection failed: {e}")
-            self.client = None
+            return True
+        except Exception as e:
+            if not self._socket_fallback:
+                logger.warning(f"Redis connection failed: {e}")
+                return False
+            logger.info(f"Redis UNIX socket unavailable, falling back to TCP: {e}")
+            self._socket_fallback = False
+            self.client = redis.Redis(connection_pool=_get_pool(*self._tcp_address))
+            return self._ping()
+
+    def _compress(self, data: bytes) -> bytes:
+        """Сжатие значения zstd уровня 1: почти без затрат CPU, заметно меньше памяти и трафика."""
+        if not self._compress_enabled:
+            return data
+        cctx = getattr(self._zstd, "cctx", None)
+        if cctx is None:
+            cctx = self._zstd.cctx = zstandard.ZstdCompressor(level=1)
+        return cctx.compress(data)
+
+    def _decompress(self, raw: bytes) -> bytes:
+        """Распаковка значения; значения, записанные без сжатия, возвращаются как есть."""
+        if not raw.startswith(ZSTD_MAGIC):
+            return raw
+        dctx = getattr(self._zstd, "dctx", None)
+        if dctx is None:
+            dctx = self._zstd.dctx = zstandard.ZstdDecompressor()
+        return dctx.decompress(raw)
+
+    def _encode(self, data: Any) -> bytes:
+        """Сериализация данных кэша в выбранном формате."""
+        if self._codec == "msgpack":
+            raw = msgpack.packb(data, use_bin_type=True, default=_to_builtin)
+        elif ORJSON_AVAILABLE:
+            # orjson пишет UTF-8 сразу и сериализует numpy-массивы без перевода в списки
+            raw = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY, default=_to_builtin)
+        else:
+            raw = json.dumps(data, ensure_ascii=False, default=_to_builtin).encode('utf-8')
+        return self._compress(raw)
+
+    def _decode(self, raw: bytes) -> Any:
+        """Десериализация данных кэша в выбранном формате."""
+        raw = self._decompress(raw)
+        if self._codec == "msgpack":
+            return msgpack.unpackb(raw, raw=False)
+        if ORJSON_AVAILABLE:
+            return orjson.loads(raw)
+        return json.loads(raw.decode('utf-8'))
+
+    def _pack_vectors(self, vectors: Any) -> bytes:
+        """Сериализация векторов: заголовок и сырые байты числового массива (tobytes)."""
+        vectors = np.ascontiguousarray(vectors)
+        if vectors.dtype.hasobject:
+            raise TypeError("Only numeric vectors can be cached")
+        header = VECTORS_HEADER.pack(VECTORS_MAGIC, vectors.dtype.str.encode("ascii"), vectors.ndim)
+        shape = struct.pack(f"<{vectors.ndim}Q", *vectors.shape)
+        return self._compress(header + shape + vectors.tobytes())
+
+    def _unpack_vectors(self, raw: bytes) -> Any:
+        """
+        Десериализация векторов, записанных _pack_vectors.
+
+        Массив строится через np.frombuffer поверх полученных байтов без разбора и копирования,
+        поэтому он доступен только для чтения.
+        """
+        raw = self._decompress(raw)
+        if not raw.startswith(VECTORS_MAGIC):
+            raise ValueError("Unknown vectors cache format")
+        _, dtype, ndim = VECTORS_HEADER.unpack_from(raw)
+        shape = struct.unpack_from(f"<{ndim}Q", raw, VECTORS_HEADER.size)
+        offset = VECTORS_HEADER.size + 8 * ndim
+        return np.frombuffer(raw, dtype=np.dtype(dtype.rstrip(b"\0").decode("ascii")), offset=offset).reshape(shape)
 
     def _make_key(self, prefix: str, data_hash: str) -> str:
         """Создание ключа для кэша."""
         return f"news_analyzer:{prefix}:{data_hash}"
 
+    def _params_hash(self, params: Dict[str, Any]) -> str:
+        """Хэш параметров для уникальности ключа."""
+        params_str = json.dumps(params, sort_keys=True)
+        return hashlib.sha256(params_str.encode()).hexdigest()[:8]
+
+    def _clusters_key(self, vectors_hash: str, params: Dict[str, Any]) -> str:
+        """Ключ результатов кластеризации."""
+        return self._make_key("clusters", f"{vectors_hash}_{self._params_hash(params)}")
+
+    def _narratives_key(self, clusters_hash: str, params: Dict[str, Any]) -> str:
+        """Ключ нарративов."""
+        return self._make_key("narratives", f"{clusters_hash}_{self._params_hash(params)}")
+
+    def _index_key(self, prefix: str) -> str:
+        """
+        Ключ индекса (ZSET: ключ кэша -> время истечения), в котором хранятся ключи одной категории.
+
+        Имя отличается от прежних индексов-SET (news_analyzer:index:*), чтобы ZADD не упал
+        с WRONGTYPE на уже существующем ключе.
+        """
+        return f"news_analyzer:expiry_index:{prefix}"
+
+    def _store(self, prefix: str, key: str, ttl_seconds: int, data: bytes, client=None):
+        """
+        Запись значения вместе с регистрацией ключа в индексе категории (Lua, один RTT, атомарно).
+
+        client: pipeline, в который добавляется вызов скрипта (по умолчанию - сразу на сервер)
+        """
+        self._store_script(keys=[key, self._index_key(prefix)], args=[data, ttl_seconds],
+                           client=client or self.client)
+
+    def _text_vectors_keys(self, texts: List[str]) -> List[str]:
+        """Ключи векторов отдельных текстов (get_vectors_per_text)."""
+        return [self._make_key("text_vectors", self._hash_texts([text])) for text in texts]
+
     def _hash_texts(self, texts: List[str]) -> str:
-        """Создание хэша для списка текстов."""
-        content = "|".join(texts).encode('utf-8')
-        return hashlib.sha256(content).hexdigest()[:16]
+        """
+        Создание хэша для списка текстов.
 
-    def get_vectorized_texts(self, texts: List[str]) -> Optional[List[List[float]]]:
+        Тексты хэшируются потоково, без склейки в одну строку; разделитель \x1f
+        не дает разным разбиениям одного и того же текста совпасть по хэшу.
+        """
+        h = blake3.blake3() if BLAKE3_AVAILABLE else hashlib.blake2b(digest_size=8)
+        for text in texts:
+            h.update(text.encode('utf-8'))
+            h.update(b'\x1f')
+        return h.hexdigest(length=8) if BLAKE3_AVAILABLE else h.hexdigest()
+
+    def get_vectorized_texts(self, texts: List[str], texts_hash: Optional[str] = None) -> Optional[np.ndarray]:
         """
         Получение векторизованных текстов из кэша.
 
         Args:
             texts: Список текстов
+            texts_hash: Уже вычисленный _hash_texts(texts), чтобы не хэшировать тексты повторно
 
         Returns:
-            Векторы или None если не найдено в кэше
+            Матрица векторов (только для чтения: построена поверх байтов из Redis без копирования;
+            для изменения нужен .copy()) или None если не найдено в кэше
         """
-        if not self.client:
+        if not self.health_check():
             return None
 
         try:
-            texts_hash = self._hash_texts(texts)
+            if texts_hash is None:
+                texts_hash = self._hash_texts(texts)
             key = self._make_key("vectors", texts_hash)
 
             cached_data = self.client.get(key)
             if cached_data:
-                vectors = pickle.loads(cached_data)  # nosec - local cache only
-                logger.debug("Retrieved vectorized texts from cache", "key", key)
+                vectors = self._unpack_vectors(cached_data)
+                logger.debug(f"Retrieved vectorized texts from cache (key={key})")
                 return vectors
         except Exception as e:
-            logger.warning("Failed to get vectorized texts from cache", "error", str(e))
+            logger.warning(f"Failed to get vectorized texts from cache: {e}")
 
         return None
 
-    def set_vectorized_texts(self, texts: List[str], vectors: List[List[float]], ttl_seconds: int = 3600):
+    def set_vectorized_texts(self, texts: List[str], vectors: List[List[float]], ttl_seconds: int = 3600,
+                             texts_hash: Optional[str] = None):
         """
         Сохранение векторизованных текстов в кэш.
 
@@ -83,21 +324,70 @@ class RedisCache:
             texts: Список текстов
             vectors: Векторы
             ttl_seconds: Время жизни в секундах
+            texts_hash: Уже вычисленный _hash_texts(texts), чтобы не хэшировать тексты повторно
         """
-        if not self.client:
+        if not self.health_check():
             return
 
         try:
-            texts_hash = self._hash_texts(texts)
+            if texts_hash is None:
+                texts_hash = self._hash_texts(texts)
             key = self._make_key("vectors", texts_hash)
 
-            # Сериализация с помощью pickle для numpy arrays
-            data = pickle.dumps(vectors)
-            self.client.setex(key, ttl_seconds, data)
+            data = self._pack_vectors(vectors)
+            self._store("vectors", key, ttl_seconds, data)
+
+            logger.debug(f"Cached vectorized texts (key={key}, ttl={ttl_seconds})")
+        except Exception as e:
+            logger.warning(f"Failed to cache vectorized texts: {e}")
+
+    def get_vectors_per_text(self, texts: List[str],
+                             compute: Callable[[List[str]], Sequence[np.ndarray]],
+                             ttl_seconds: int = 3600) -> List[np.ndarray]:
+        """
+        Получение векторов с кэшированием по отдельным текстам.
+
+        Все ключи проверяются одним MGET, compute вызывается только для промахов,
+        новые векторы записываются одним пакетом в отдельный индекс text_vectors. Подходит для векторов, зависящих
+        только от самого текста (эмбеддинги), но не для TF-IDF, где вес зависит от корпуса.
+
+        Args:
+            texts: Список текстов
+            compute: Функция, векторизующая список текстов (по вектору на текст)
+            ttl_seconds: Время жизни в секундах
+
+        Returns:
+            Векторы в порядке texts
+        """
+        if not self.health_check():
+            return list(compute(texts))
+
+        keys = self._text_vectors_keys(texts)
+        try:
+            cached = self.client.mget(keys)
+            vectors: List[Optional[np.ndarray]] = [
+                self._unpack_vectors(raw) if raw is not None else None for raw in cached
+            ]
+        except Exception as e:
+            logger.warning(f"Failed to get per-text vectors from cache: {e}")
+            return list(compute(texts))
 
-            logger.debug("Cached vectorized texts", "key", key, "ttl", ttl_seconds)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors
+
+        computed = compute([texts[i] for i in missing])
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                for i, vector in zip(missing, computed):
+                    vectors[i] = vector
+                    self._store("text_vectors", keys[i], ttl_seconds, self._pack_vectors(vector), client=pipe)
+                pipe.execute()
+            logger.debug(f"Cached {len(missing)} of {len(texts)} per-text vectors")
         except Exception as e:
-            logger.warning("Failed to cache vectorized texts", "error", str(e))
+            logger.warning(f"Failed to cache per-text vectors: {e}")
+
+        return vectors
 
     def get_clustering_result(self, vectors_hash: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -110,22 +400,19 @@ class RedisCache:
         Returns:
             Результаты кластеризации или None
         """
-        if not self.client:
+        if not self.health_check():
             return None
 
         try:
-            # Создаем хэш параметров для уникальности
-            params_str = json.dumps(params, sort_keys=True)
-            params_hash = hashlib.sha256(params_str.encode()).hexdigest()[:8]
-            key = self._make_key("clusters", f"{vectors_hash}_{params_hash}")
+            key = self._clusters_key(vectors_hash, params)
 
             cached_data = self.client.get(key)
             if cached_data:
-                result = json.loads(cached_data.decode('utf-8'))
-                logger.debug("Retrieved clustering result from cache", "key", key)
+                result = self._decode(cached_data)
+                logger.debug(f"Retrieved clustering result from cache (key={key})")
                 return result
         except Exception as e:
-            logger.warning("Failed to get clustering result from cache", "error", str(e))
+            logger.warning(f"Failed to get clustering result from cache: {e}")
 
         return None
 
@@ -140,22 +427,18 @@ class RedisCache:
             result: Результаты кластеризации
             ttl_seconds: Время жизни в секундах
         """
-        if not self.client:
+        if not self.health_check():
             return
 
         try:
-            # Создаем хэш параметров для уникальности
-            params_str = json.dumps(params, sort_keys=True)
-            params_hash = hashlib.sha256(params_str.encode()).hexdigest()[:8]
-            key = self._make_key("clusters", f"{vectors_hash}_{params_hash}")
+            key = self._clusters_key(vectors_hash, params)
 
-            # Сериализация в JSON
-            data = json.dumps(result, ensure_ascii=False)
-            self.client.setex(key, ttl_seconds, data)
+            data = self._encode(result)
+            self._store("clusters", key, ttl_seconds, data)
 
-            logger.debug("Cached clustering result", "key", key, "ttl", ttl_seconds)
+            logger.debug(f"Cached clustering result (key={key}, ttl={ttl_seconds})")
         except Exception as e:
-            logger.warning("Failed to cache clustering result", "error", str(e))
+            logger.warning(f"Failed to cache clustering result: {e}")
 
     def get_narratives(self, clusters_hash: str, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
         """
@@ -168,21 +451,19 @@ class RedisCache:
         Returns:
             Нарративы или None
         """
-        if not self.client:
+        if not self.health_check():
             return None
 
         try:
-            params_str = json.dumps(params, sort_keys=True)
-            params_hash = hashlib.sha256(params_str.encode()).hexdigest()[:8]
-            key = self._make_key("narratives", f"{clusters_hash}_{params_hash}")
+            key = self._narratives_key(clusters_hash, params)
 
             cached_data = self.client.get(key)
             if cached_data:
-                narratives = json.loads(cached_data.decode('utf-8'))
-                logger.debug("Retrieved narratives from cache", "key", key)
+                narratives = self._decode(cached_data)
+                logger.debug(f"Retrieved narratives from cache (key={key})")
                 return narratives
         except Exception as e:
-            logger.warning("Failed to get narratives from cache", "error", str(e))
+            logger.warning(f"Failed to get narratives from cache: {e}")
 
         return None
 
@@ -197,20 +478,88 @@ class RedisCache:
             narratives: Нарративы
             ttl_seconds: Время жизни в секундах
         """
-        if not self.client:
+        if not self.health_check():
+            return
+
+        try:
+            key = self._narratives_key(clusters_hash, params)
+
+            data = self._encode(narratives)
+            self._store("narratives", key, ttl_seconds, data)
+
+            logger.debug(f"Cached narratives (key={key}, ttl={ttl_seconds})")
+        except Exception as e:
+            logger.warning(f"Failed to cache narratives: {e}")
+
+    def get_analysis_bundle(self, data_hash: str, cluster_params: Dict[str, Any],
+                            narrative_params: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]],
+                                                                       Optional[List[Dict[str, Any]]]]:
+        """
+        Получение результатов кластеризации и нарративов за один сетевой обход.
+
+        Кластеризация детерминирована при тех же векторах и параметрах, поэтому нарративы
+        связки адресуются хэшем данных и обоими наборами параметров, без хэша меток.
+
+        Args:
+            data_hash: Хэш векторов
+            cluster_params: Параметры кластеризации
+            narrative_params: Параметры построения нарративов
+
+        Returns:
+            Пара (результаты кластеризации, нарративы); отсутствующие элементы - None
+        """
+        if not self.health_check():
+            return None, None
+
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(self._clusters_key(data_hash, cluster_params))
+                pipe.get(self._bundle_narratives_key(data_hash, cluster_params, narrative_params))
+                clusters_raw, narratives_raw = pipe.execute()
+
+            clusters = self._decode(clusters_raw) if clusters_raw else None
+            narratives = self._decode(narratives_raw) if narratives_raw else None
+            return clusters, narratives
+        except Exception as e:
+            logger.warning(f"Failed to get analysis bundle from cache: {e}")
+
+        return None, None
+
+    def set_analysis_bundle(self, data_hash: str, cluster_params: Dict[str, Any], result: Dict[str, Any],
+                            narrative_params: Dict[str, Any], narratives: List[Dict[str, Any]],
+                            ttl_seconds: int = 1800):
+        """
+        Атомарное сохранение результатов кластеризации и нарративов одним пакетом MULTI/EXEC.
+
+        Args:
+            data_hash: Хэш векторов
+            cluster_params: Параметры кластеризации
+            result: Результаты кластеризации
+            narrative_params: Параметры построения нарративов
+            narratives: Нарративы
+            ttl_seconds: Время жизни в секундах
+        """
+        if not self.health_check():
             return
 
         try:
-            params_str = json.dumps(params, sort_keys=True)
-            params_hash = hashlib.sha256(params_str.encode()).hexdigest()[:8]
-            key = self._make_key("narratives", f"{clusters_hash}_{params_hash}")
+            clusters_key = self._clusters_key(data_hash, cluster_params)
+            narratives_key = self._bundle_narratives_key(data_hash, cluster_params, narrative_params)
 
-            data = json.dumps(narratives, ensure_ascii=False)
-            self.client.setex(key, ttl_seconds, data)
+            # Каждая половина записывается скриптом вместе со своим индексом
+            with self.client.pipeline(transaction=True) as pipe:
+                self._store("clusters", clusters_key, ttl_seconds, self._encode(result), client=pipe)
+                self._store("narratives", narratives_key, ttl_seconds, self._encode(narratives), client=pipe)
+                pipe.execute()
 
-            logger.debug("Cached narratives", "key", key, "ttl", ttl_seconds)
+            logger.debug(f"Cached analysis bundle (clusters={clusters_key}, narratives={narratives_key})")
         except Exception as e:
-            logger.warning("Failed to cache narratives", "error", str(e))
+            logger.warning(f"Failed to cache analysis bundle: {e}")
+
+    def _bundle_narratives_key(self, data_hash: str, cluster_params: Dict[str, Any],
+                               narrative_params: Dict[str, Any]) -> str:
+        """Ключ нарративов связки: зависит от данных и от параметров обоих этапов."""
+        return self._narratives_key(data_hash, {"clustering": cluster_params, "narratives": narrative_params})
 
     def invalidate_analysis_cache(self, texts: List[str]):
         """
@@ -219,72 +568,93 @@ class RedisCache:
         Args:
             texts: Список текстов
         """
-        if not self.client:
+        if not self.health_check():
             return
 
         try:
             texts_hash = self._hash_texts(texts)
 
             # Удаляем все связанные ключи
-            patterns = [
-                f"news_analyzer:vectors:{texts_hash}*",
-                f"news_analyzer:clusters:*{texts_hash}*",
-                f"news_analyzer:narratives:*{texts_hash}*"
-            ]
-
-            for pattern in patterns:
-                keys = self.client.keys(pattern)
-                if keys:
-                    self.client.delete(*keys)
-                    logger.debug("Invalidated cache keys", "pattern", pattern, "count", len(keys))
+            patterns = {
+                "vectors": f"news_analyzer:vectors:{texts_hash}*",
+                "clusters": f"news_analyzer:clusters:*{texts_hash}*",
+                "narratives": f"news_analyzer:narratives:*{texts_hash}*"
+            }
+
+            # SCAN обходит ключи порциями и не блокирует сервер
+            found = {
+                prefix: list(self.client.scan_iter(match=pattern, count=SCAN_COUNT))
+                for prefix, pattern in patterns.items()
+            }
+            # Векторы отдельных текстов хранятся по хэшу каждого текста, их ключи известны заранее
+            found["text_vectors"] = self._text_vectors_keys(texts)
+            keys = [key for prefix_keys in found.values() for key in prefix_keys]
+            if keys:
+                # Удаление ключей и чистка индексов уходят одним пакетом
+                with self.client.pipeline(transaction=False) as pipe:
+                    pipe.delete(*keys)
+                    for prefix, prefix_keys in found.items():
+                        if prefix_keys:
+                            pipe.zrem(self._index_key(prefix), *prefix_keys)
+                    pipe.execute()
+                logger.debug(f"Invalidated {len(keys)} cache keys")
 
         except Exception as e:
-            logger.warning("Failed to invalidate cache", "error", str(e))
+            logger.warning(f"Failed to invalidate cache: {e}")
 
     def clear_all_cache(self):
         """Очистка всего кэша news-analyzer."""
-        if not self.client:
+        if not self.health_check():
             return
 
         try:
-            keys = self.client.keys("news_analyzer:*")
+            keys = list(self.client.scan_iter(match="news_analyzer:*", count=SCAN_COUNT))
             if keys:
                 self.client.delete(*keys)
-                logger.info("Cleared all cache", "keys_deleted", len(keys))
+                logger.info(f"Cleared all cache (keys_deleted={len(keys)})")
         except Exception as e:
-            logger.error("Failed to clear cache", "error", str(e))
+            logger.error(f"Failed to clear cache: {e}")
 
     def get_cache_stats(self) -> Dict[str, int]:
-        """Получение статистики кэша."""
-        stats = {
-            "vectors": 0,
-            "clusters": 0,
-            "narratives": 0,
-            "total": 0
-        }
+        """
+        Получение статистики кэша.
 
-        if not self.client:
+        Считает ключи по индексам (ZCARD), не обходя всё пространство ключей. Записи
+        истекших по TTL ключей удаляются из индексов тем же скриптом перед подсчетом.
+        """
+        stats = {prefix: 0 for prefix in INDEX_PREFIXES}
+        stats["total"] = 0
+
+        if not self.health_check():
             return stats
 
         try:
-            patterns = ["news_analyzer:vectors:*", "news_analyzer:clusters:*", "news_analyzer:narratives:*"]
-            for i, pattern in enumerate(patterns):
-                keys = self.client.keys(pattern)
-                count = len(keys)
-                stats[list(stats.keys())[i]] = count
+            counts = self._count_script(keys=[self._index_key(prefix) for prefix in INDEX_PREFIXES],
+                                        client=self.client)
+            for prefix, count in zip(INDEX_PREFIXES, counts):
+                stats[prefix] = count
                 stats["total"] += count
         except Exception as e:
-            logger.warning("Failed to get cache stats", "error", str(e))
+            logger.warning(f"Failed to get cache stats: {e}")
 
         return stats
 
     def health_check(self) -> bool:
-        """Проверка здоровья Redis соединения."""
+        """
+        Проверка здоровья Redis соединения.
+
+        Результат кэшируется на HEALTH_CHECK_TTL секунд, поэтому вызов перед каждой
+        операцией кэша не добавляет лишний PING.
+        """
         if not self.client:
             return False
 
-        try:
-            self.client.ping()
-            return True
-        except:
-            return False
\ No newline at end of file
+        now = time.monotonic()
+        if self._last_check is not None and now - self._last_check[0] < HEALTH_CHECK_TTL:
+            return self._last_check[1]
+
+        healthy = self._ping()
+        if healthy and (self._last_check is None or not self._last_check[1]):
+            logger.info("Redis connection established")
+        self._last_check = (now, healthy)
+        return healthy
\ No newline at end of file
@@ -45,6 +45,7 @@ class Settings:
         self.max_features = vec_config.get("max_features", 5000)
         self.min_df = vec_config.get("min_df", 2)
         self.max_df = vec_config.get("max_df", 0.95)
+        self.use_hashing = vec_config.get("use_hashing", False)
         
         # Кластеризация
         cluster_config = config_dict.get("clustering", {})
@@ -1,5 +1,5 @@
 """Модуль для работы с базой данных PostgreSQL."""
 
-from .database import Database, NewsItem, User, AnalysisResult
+from .database import Database, NewsItem, User, AnalysisResult, AdminStats
 
-__all__ = ["Database", "NewsItem", "User", "AnalysisResult"]
+__all__ = ["Database", "NewsItem", "User", "AnalysisResult", "AdminStats"]
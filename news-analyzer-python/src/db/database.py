@@ -3,16 +3,32 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor, Json
 from psycopg2 import sql
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+import io
 import json
+import threading
+import time
 
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _csv_field(value: Any) -> str:
+    """
+    Форматирует значение как поле CSV для COPY.
+
+    None становится пустым полем без кавычек (в CSV-формате PostgreSQL это NULL),
+    остальное берется в кавычки, поэтому пустая строка остается пустой строкой,
+    а запятые и переводы строк внутри значения не ломают разбор.
+    """
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
 @dataclass
 class NewsItem:
     """Структура новости из БД."""
@@ -44,18 +60,44 @@ class AnalysisResult:
     created_at: datetime
 
 
+@dataclass
+class AdminStats:
+    """Сводная статистика для администратора."""
+    total_users: int
+    total_news: int
+    total_sources: int
+
+
 class Database:
     """Класс для работы с PostgreSQL."""
     
-    def __init__(self, connection_string: str):
+    def __init__(
+        self,
+        connection_string: str,
+        connection: Optional[psycopg2.extensions.connection] = None,
+        count_cache_ttl: float = 5.0
+    ):
         """
         Инициализация подключения к БД.
         
         Args:
             connection_string: Строка подключения в формате psycopg2
+            connection: Уже открытое подключение (например, из пула);
+                тогда connect() вызывать не нужно
+            count_cache_ttl: Сколько секунд переиспользовать результат
+                get_news_count_last_hours (0 - не кэшировать)
         """
         self.connection_string = connection_string
-        self._conn: Optional[psycopg2.extensions.connection] = None
+        self._conn: Optional[psycopg2.extensions.connection] = connection
+        self._count_cache_ttl = count_cache_ttl
+        # (hours, table_name) -> (момент истечения, количество)
+        self._count_cache: Dict[Tuple[int, str], Tuple[float, int]] = {}
+        self._count_cache_lock = threading.Lock()
+    
+    @property
+    def connection(self) -> Optional[psycopg2.extensions.connection]:
+        """Текущее подключение к БД."""
+        return self._conn
     
     def connect(self) -> None:
         """Устанавливает подключение к БД."""
@@ -90,6 +132,9 @@ class Database:
         """
         Получает количество новостей за последние N часов.
 
+        Результат кэшируется на count_cache_ttl секунд, так что повторные
+        запросы с теми же параметрами не обращаются к БД.
+
         Args:
             hours: Количество часов для выборки
             table_name: Имя таблицы с новостями
@@ -100,6 +145,13 @@ class Database:
         if not self._conn:
             raise RuntimeError("Подключение к БД не установлено. Вызовите connect() или используйте контекстный менеджер.")
 
+        cache_key = (hours, table_name)
+        if self._count_cache_ttl > 0:
+            with self._count_cache_lock:
+                cached = self._count_cache.get(cache_key)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+
         # Вычисляем временную границу
         time_threshold = datetime.now() - timedelta(hours=hours)
 
@@ -116,12 +168,21 @@ class Database:
             with self._conn.cursor() as cursor:
                 cursor.execute(query, (time_threshold,))
                 count = cursor.fetchone()[0]
-                return count
+
+            if self._count_cache_ttl > 0:
+                with self._count_cache_lock:
+                    self._count_cache[cache_key] = (time.monotonic() + self._count_cache_ttl, count)
+            return count
 
         except psycopg2.Error as e:
             logger.error(f"Ошибка при получении количества новостей: {e}")
             raise
 
+    def _clear_count_cache(self) -> None:
+        """Сбрасывает кэш количества новостей после изменения данных."""
+        with self._count_cache_lock:
+            self._count_cache.clear()
+
     def get_news_last_hours(
         self,
         hours: int = 24,
@@ -250,6 +311,40 @@ class Database:
             logger.error(f"Ошибка при получении пользователей: {e}")
             raise
     
+    def get_admin_stats(self) -> AdminStats:
+        """
+        Получает количество пользователей, новостей и источников.
+
+        Все три счетчика считаются скалярными подзапросами в одном
+        SELECT, поэтому статистика приходит за одно обращение к серверу.
+
+        Returns:
+            Статистика для администратора
+        """
+        if not self._conn:
+            raise RuntimeError("Подключение к БД не установлено. Вызовите connect() или используйте контекстный менеджер.")
+
+        query = """
+            SELECT
+                (SELECT COUNT(*) FROM users) AS total_users,
+                (SELECT COUNT(*) FROM news) AS total_news,
+                (SELECT COUNT(*) FROM sources) AS total_sources
+        """
+
+        try:
+            with self._conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(query)
+                row = cursor.fetchone()
+                return AdminStats(
+                    total_users=row["total_users"],
+                    total_news=row["total_news"],
+                    total_sources=row["total_sources"]
+                )
+
+        except psycopg2.Error as e:
+            logger.error(f"Ошибка при получении статистики: {e}")
+            raise
+    
     def test_connection(self) -> bool:
         """
         Проверяет подключение к БД.
@@ -269,6 +364,57 @@ class Database:
             logger.error(f"Ошибка при тесте подключения: {e}")
             return False
     
+    def copy_news(
+        self,
+        rows: Sequence[Tuple[Optional[int], str, str, str, datetime]],
+        table_name: str = "news"
+    ) -> int:
+        """
+        Загружает пачку новостей через COPY FROM STDIN.
+
+        Самый быстрый способ массовой вставки: строки уходят одним потоком
+        CSV, без разбора и планирования INSERT на каждую пачку. ID
+        загруженных строк не возвращаются, дубликаты не пропускаются.
+
+        Args:
+            rows: Кортежи (source_id, title, description, link, published_at)
+            table_name: Имя таблицы с новостями
+
+        Returns:
+            Количество загруженных строк
+        """
+        if not self._conn:
+            raise RuntimeError("Подключение к БД не установлено. Вызовите connect() или используйте контекстный менеджер.")
+
+        if not rows:
+            return 0
+
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(",".join(_csv_field(value) for value in row))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        query = sql.SQL("""
+            COPY {} (source_id, title, description, link, published_at)
+            FROM STDIN WITH (FORMAT csv)
+        """).format(sql.Identifier(table_name))
+
+        try:
+            with self._conn.cursor() as cursor:
+                cursor.copy_expert(query.as_string(cursor), buffer)
+                copied = cursor.rowcount
+                self._conn.commit()
+                self._clear_count_cache()
+
+                logger.info(f"Загружено {copied} новостей в {table_name} через COPY")
+                return copied
+
+        except psycopg2.Error as e:
+            self._conn.rollback()
+            logger.error(f"Ошибка при загрузке новостей через COPY: {e}")
+            raise
+
     def save_analysis_result(
         self,
         analysis_date: datetime,
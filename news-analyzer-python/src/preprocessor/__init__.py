@@ -1,5 +1,5 @@
 """Модуль предобработки текста."""
 
-from .text_cleaner import TextCleaner
+from .text_cleaner import TextCleaner, AdvancedTextCleaner
 
-__all__ = ["TextCleaner"]
+__all__ = ["TextCleaner", "AdvancedTextCleaner"]
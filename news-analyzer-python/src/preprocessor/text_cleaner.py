@@ -1,6 +1,7 @@
 """Продвинутая очистка и предобработка текста для русского языка."""
 
 import re
+import functools
 from typing import List, Optional, Dict, Set
 import nltk
 from nltk.corpus import stopwords
@@ -78,6 +79,20 @@ EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b
 PHONE_PATTERN = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\+\d{1,3}[-.\s]?\d{3}[-.\s]?\d{3}[-.\s]?\d{4}')
 HTML_PATTERN = re.compile(r'<[^>]+>')
 MULTISPACE_PATTERN = re.compile(r'\s+')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s\u0400-\u04FF]')
+DIGITS_PATTERN = re.compile(r'\d+')
+SENTENCE_END_PATTERN = re.compile(r'[.!?]+')
+WORD_PATTERN = re.compile(r'\w+')
+# Упрощенные шаблоны для TextCleaner
+SIMPLE_URL_PATTERN = re.compile(r"http\S+|www\.\S+")
+SIMPLE_EMAIL_PATTERN = re.compile(r"\S+@\S+")
+NON_TEXT_PATTERN = re.compile(r"[^а-яёa-z0-9\s\-]")
+# Замены похожих символов на стандартные
+UNICODE_REPLACEMENTS = {
+    '"': '"', '"': '"', ''': "'", ''': "'",
+    '–': '-', '—': '-', '…': '...',
+    '№': 'N', '°': 'grad'
+}
 
 class AdvancedTextCleaner:
     """Продвинутый очистчик текста с лемматизацией и нормализацией."""
@@ -90,7 +105,8 @@ class AdvancedTextCleaner:
                  normalize_unicode: bool = True,
                  custom_stopwords: Optional[Set[str]] = None,
                  min_word_length: int = 3,
-                 max_word_length: int = 20):
+                 max_word_length: int = 20,
+                 use_nltk: bool = False):
         """
         Инициализация продвинутого очистчика текста.
 
@@ -103,8 +119,10 @@ class AdvancedTextCleaner:
             custom_stopwords: Дополнительные стоп-слова
             min_word_length: Минимальная длина слова
             max_word_length: Максимальная длина слова
+            use_nltk: Токенизировать через NLTK word_tokenize вместо регулярного выражения
         """
         self.use_lemmatization = use_lemmatization and MORPH_AVAILABLE
+        self.use_nltk = use_nltk
         self.remove_urls = remove_urls
         self.remove_emails = remove_emails
         self.remove_numbers = remove_numbers
@@ -127,7 +145,7 @@ class AdvancedTextCleaner:
                 logger.warning(f"Не удалось инициализировать лемматизатор: {e}")
                 self.use_lemmatization = False
 
-        logger.info("AdvancedTextCleaner инициализирован", "lemmatization", self.use_lemmatization)
+        logger.info(f"AdvancedTextCleaner инициализирован (lemmatization={self.use_lemmatization})")
 
     def preprocess(self, text: str) -> str:
         """
@@ -139,6 +157,27 @@ class AdvancedTextCleaner:
         Returns:
             Очищенный и обработанный текст
         """
+        return self._preprocess(text)
+
+    def preprocess_batch(self, texts: List[str]) -> List[str]:
+        """
+        Предобработка пачки текстов.
+
+        Результат совпадает с preprocess для каждого текста, но леммы
+        вычисляются один раз на всю пачку: слова в новостях за день
+        сильно повторяются, а разбор pymorphy2 - самый дорогой шаг.
+
+        Args:
+            texts: Исходные тексты
+
+        Returns:
+            Обработанные тексты в том же порядке
+        """
+        lemma_cache: Dict[str, str] = {}
+        return [self._preprocess(text, lemma_cache) for text in texts]
+
+    def _preprocess(self, text: str, lemma_cache: Optional[Dict[str, str]] = None) -> str:
+        """Предобработка одного текста; lemma_cache переиспользует леммы между вызовами."""
         if not text or not text.strip():
             return ""
 
@@ -165,11 +204,11 @@ class AdvancedTextCleaner:
             text = text.lower()
 
             # 7. Удаление пунктуации и специальных символов (кроме кириллицы и пробелов)
-            text = re.sub(r'[^\w\s\u0400-\u04FF]', ' ', text)
+            text = PUNCTUATION_PATTERN.sub(' ', text)
 
             # 8. Удаление чисел
             if self.remove_numbers:
-                text = re.sub(r'\d+', ' ', text)
+                text = DIGITS_PATTERN.sub(' ', text)
 
             # 9. Нормализация пробелов
             text = MULTISPACE_PATTERN.sub(' ', text).strip()
@@ -186,7 +225,16 @@ class AdvancedTextCleaner:
 
             # 13. Лемматизация (если доступна)
             if self.use_lemmatization and self.morph:
-                tokens = [self._lemmatize(token) for token in tokens]
+                if lemma_cache is None:
+                    tokens = [self._lemmatize(token) for token in tokens]
+                else:
+                    lemmas = []
+                    for token in tokens:
+                        lemma = lemma_cache.get(token)
+                        if lemma is None:
+                            lemma = lemma_cache[token] = self._lemmatize(token)
+                        lemmas.append(lemma)
+                    tokens = lemmas
 
             # 14. Финальная фильтрация пустых токенов
             tokens = [token for token in tokens if token.strip()]
@@ -194,7 +242,7 @@ class AdvancedTextCleaner:
             return ' '.join(tokens)
 
         except Exception as e:
-            logger.error("Ошибка при предобработке текста", "error", str(e), "text_length", len(text))
+            logger.error(f"Ошибка при предобработке текста: {e} (text_length={len(text)})")
             # Fallback: базовая очистка
             return self._basic_preprocess(text)
 
@@ -204,26 +252,24 @@ class AdvancedTextCleaner:
             # NFKC нормализация (композиция + совместимость)
             text = unicodedata.normalize('NFKC', text)
             # Заменяем похожие символы на стандартные
-            replacements = {
-                '"': '"', '"': '"', ''': "'", ''': "'",
-                '–': '-', '—': '-', '…': '...',
-                '№': 'N', '°': 'grad'
-            }
-            for old, new in replacements.items():
+            for old, new in UNICODE_REPLACEMENTS.items():
                 text = text.replace(old, new)
             return text
         except Exception:
             return text
 
     def _tokenize(self, text: str) -> List[str]:
-        """Умная токенизация с fallback."""
+        """Токенизация; NLTK (медленнее, с fallback) - только при use_nltk=True."""
+        if not self.use_nltk:
+            # Пунктуация к этому моменту уже удалена, поэтому хватает поиска слов в C-коде re
+            return WORD_PATTERN.findall(text)
+
         try:
-            # Сначала пытаемся использовать NLTK
             _ensure_nltk_data()
             tokens = word_tokenize(text, language='russian')
             return tokens
         except Exception as e:
-            logger.debug("NLTK tokenization failed, using fallback", "error", str(e))
+            logger.debug(f"NLTK tokenization failed, using fallback: {e}")
             # Fallback: простая токенизация по пробелам
             return text.split()
 
@@ -241,7 +287,7 @@ class AdvancedTextCleaner:
     def _basic_preprocess(self, text: str) -> str:
         """Базовая предобработка в случае ошибки."""
         text = text.lower()
-        text = re.sub(r'[^\w\s\u0400-\u04FF]', ' ', text)
+        text = PUNCTUATION_PATTERN.sub(' ', text)
         text = MULTISPACE_PATTERN.sub(' ', text).strip()
         words = text.split()
         words = [w for w in words if self.min_word_length <= len(w) <= self.max_word_length]
@@ -252,7 +298,7 @@ class AdvancedTextCleaner:
         stats = {
             'original_length': len(text),
             'words_count': len(text.split()),
-            'sentences_count': len(re.split(r'[.!?]+', text)) - 1,
+            'sentences_count': len(SENTENCE_END_PATTERN.split(text)) - 1,
             'urls_count': len(URL_PATTERN.findall(text)),
             'emails_count': len(EMAIL_PATTERN.findall(text)),
         }
@@ -288,12 +334,27 @@ class TextCleaner:
             min_word_length: Минимальная длина слова
             max_word_length: Максимальная длина слова
         """
-        self.stopwords = russian_stopwords.copy()
+        self.stopwords_extra = stopwords_extra
+        self.stopwords = self._base_stopwords()
         if stopwords_extra:
-            self.stopwords.update(stopwords_extra)
+            self.stopwords = self.stopwords | frozenset(map(str.lower, stopwords_extra))
         
         self.min_word_length = min_word_length
         self.max_word_length = max_word_length
+
+        # Токен - целый отрезок из букв, цифр и дефисов нужной длины, содержащий хотя бы
+        # одну букву; длина и "не только цифры" проверяются самим регулярным выражением
+        word_chars = r"а-яёa-z0-9\-"
+        self._token_re = re.compile(
+            rf"(?<![{word_chars}])(?=[{word_chars}]*[а-яёa-z])"
+            rf"[{word_chars}]{{{min_word_length},{max_word_length}}}(?![{word_chars}])"
+        )
+    
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def _base_stopwords(cls) -> frozenset:
+        """Общий для всех экземпляров набор стоп-слов в нижнем регистре (строится один раз)."""
+        return frozenset(word.lower() for word in russian_stopwords)
     
     def clean_text(self, text: str) -> str:
         """
@@ -312,16 +373,16 @@ class TextCleaner:
         text = text.lower()
         
         # Удаляем URL
-        text = re.sub(r"http\S+|www\.\S+", "", text)
+        text = SIMPLE_URL_PATTERN.sub("", text)
         
         # Удаляем email
-        text = re.sub(r"\S+@\S+", "", text)
+        text = SIMPLE_EMAIL_PATTERN.sub("", text)
         
         # Оставляем буквы, цифры, пробелы и дефисы (для составных слов)
-        text = re.sub(r"[^а-яёa-z0-9\s\-]", " ", text)
+        text = NON_TEXT_PATTERN.sub(" ", text)
         
         # Удаляем множественные пробелы
-        text = re.sub(r"\s+", " ", text)
+        text = MULTISPACE_PATTERN.sub(" ", text)
         
         return text.strip()
     
@@ -338,36 +399,9 @@ class TextCleaner:
         if not text:
             return []
 
-        # Обеспечиваем загрузку NLTK данных
-        _ensure_nltk_data()
-
-        try:
-            # Токенизация
-            tokens = word_tokenize(text, language="russian")
-        except LookupError:
-            logger.warning("NLTK punkt все еще не найден после загрузки, используем fallback")
-            # Простая токенизация по пробелам
-            tokens = text.split()
-        
-        # Фильтрация
-        filtered_tokens = []
-        for token in tokens:
-            # Проверяем длину
-            if len(token) < self.min_word_length or len(token) > self.max_word_length:
-                continue
-            
-            # Проверяем стоп-слова (менее строго)
-            if token in self.stopwords:
-                continue
-
-            # Разрешаем слова с цифрами (важные для новостей: "2024", "5g", etc.)
-            # Полностью цифровые слова пропускаем, но слова с буквами и цифрами оставляем
-            if token.isdigit() and not any(c.isalpha() for c in token):
-                continue
-            
-            filtered_tokens.append(token)
-        
-        return filtered_tokens
+        # Разрешаем слова с цифрами (важные для новостей: "5g" и т.п.),
+        # полностью цифровые токены и слова вне границ длины отсекает регулярное выражение
+        return [token for token in self._token_re.findall(text.lower()) if token not in self.stopwords]
     
     def preprocess(self, text: str) -> str:
         """
@@ -379,6 +413,13 @@ class TextCleaner:
         Returns:
             Предобработанный текст (токены через пробел)
         """
-        cleaned = self.clean_text(text)
-        tokens = self.tokenize(cleaned)
-        return " ".join(tokens)
+        if not text:
+            return ""
+
+        # Регулярное выражение токенов само считает границей любой символ вне [а-яёa-z0-9-],
+        # поэтому замена прочих символов и пробелов из clean_text здесь не нужна:
+        # текст приводится к нижнему регистру один раз и проходит по нему без лишних копий
+        text = text.lower()
+        text = SIMPLE_URL_PATTERN.sub("", text)
+        text = SIMPLE_EMAIL_PATTERN.sub("", text)
+        return " ".join(token for token in self._token_re.findall(text) if token not in self.stopwords)
@@ -91,7 +91,7 @@ class AsyncNewsProcessor:
             return ""
 
     async def vectorize_texts_async(self, processed_texts: List[str],
-                                   settings: Any) -> Optional[List[List[float]]]:
+                                   settings: Any) -> Optional[np.ndarray]:
         """
         Асинхронная векторизация текстов.
 
@@ -119,7 +119,7 @@ class AsyncNewsProcessor:
 
             logger.info("Async text vectorization completed",
                 "texts_count", len(processed_texts),
-                "vectors_shape", f"{len(vectors)}x{len(vectors[0]) if vectors else 0}",
+                "vectors_shape", f"{len(vectors)}x{len(vectors[0]) if len(vectors) else 0}",
                 "processing_time", round(processing_time, 2))
 
             return vectors
@@ -128,19 +128,20 @@ class AsyncNewsProcessor:
             logger.error("Error in async vectorization", "error", str(e))
             return None
 
-    def _vectorize_texts_sync(self, processed_texts: List[str], settings: Any) -> List[List[float]]:
+    def _vectorize_texts_sync(self, processed_texts: List[str], settings: Any) -> np.ndarray:
         """Синхронная векторизация (выполняется в thread pool)."""
         max_features = min(settings.max_features, 5000)
         vectorizer = TextVectorizer(
             max_features=max_features,
             min_df=settings.min_df,
-            max_df=settings.max_df
+            max_df=settings.max_df,
+            use_hashing=settings.use_hashing
         )
 
         vectors = vectorizer.fit_transform(processed_texts)
         return vectors
 
-    async def cluster_texts_async(self, vectors: List[List[float]],
+    async def cluster_texts_async(self, vectors: np.ndarray,
                                  settings: Any) -> Optional[Dict[str, Any]]:
         """
         Асинхронная кластеризация векторов.
@@ -183,7 +184,7 @@ class AsyncNewsProcessor:
             logger.error("Error in async clustering", "error", str(e))
             return None
 
-    def _cluster_texts_sync(self, vectors: List[List[float]], settings: Any) -> Dict[str, Any]:
+    def _cluster_texts_sync(self, vectors: np.ndarray, settings: Any) -> Dict[str, Any]:
         """Синхронная кластеризация (выполняется в thread pool)."""
         clusterer = NewsClusterer(
             min_cluster_size=settings.cluster_min_size,
@@ -284,7 +285,7 @@ class AsyncNewsProcessor:
 
         # 2. Асинхронная векторизация
         vectors = await self.vectorize_texts_async(processed_texts, settings)
-        if not vectors:
+        if vectors is None or len(vectors) == 0:
             logger.error("Vectorization failed")
             return None
 
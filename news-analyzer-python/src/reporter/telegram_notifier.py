@@ -2,15 +2,47 @@
 
 import json
 import os
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Tuple, Iterator
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Максимальное количество закэшированных отчетов
+_REPORT_CACHE_SIZE = 8
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Место под заголовок части ("Часть i/n") при разбиении длинных сообщений
+_PART_HEADER_RESERVE = len("Часть 999/999\n\n")
+
+# Повторы запросов при 429 (с учетом Retry-After) и 5xx ошибках Telegram API
+_RETRY_POLICY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["POST"]),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Разделители сообщений
+_SEP_EQ = "=" * 60
+_SEP_MINUS = "-" * 60
+_SEP_DASH = "─" * 7
+
 
 class TelegramNotifier:
     """Класс для отправки отчетов в Telegram."""
@@ -30,6 +62,21 @@ class TelegramNotifier:
         self.bot_token = bot_token
         self.parse_mode = parse_mode
         self.api_url = f"https://api.telegram.org/bot{bot_token}"
+        self._send_message_url = f"{self.api_url}/sendMessage"
+        self._copy_message_url = f"{self.api_url}/copyMessage"
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(max_retries=_RETRY_POLICY))
+        # Задержка между отправками при рассылке нескольким пользователям.
+        # Telegram API имеет лимит: 30 сообщений в секунду для бота,
+        # по умолчанию 0.05 секунды (20 сообщений в секунду) для безопасности.
+        # Для контейнера используем ANALYZER_TELEGRAM_DELAY, если установлена
+        self._delay_between_messages = float(
+            os.getenv("ANALYZER_TELEGRAM_DELAY", os.getenv("TELEGRAM_SEND_DELAY", "0.05"))
+        )
+        # Чаты, заблокировавшие бота (HTTP 403): повторные отправки в них бессмысленны
+        self._blocked_chats: Set[int] = set()
+        # Кэш загруженных отчетов: (путь, mtime_ns, размер) -> (отчет, сообщение)
+        self._report_cache: Dict[Tuple[str, int, int], Tuple[Dict[str, Any], str]] = {}
     
     def send_message(self, chat_id: int, text: str, disable_notification: bool = False) -> bool:
         """
@@ -43,9 +90,12 @@ class TelegramNotifier:
         Returns:
             True если успешно, False в противном случае
         """
-        try:
-            url = f"{self.api_url}/sendMessage"
+        if chat_id in self._blocked_chats:
+            logger.debug("Пропуск отправки: бот заблокирован пользователем (chat_id: %s)", chat_id)
+            return False
 
+        url = self._send_message_url
+        try:
             # Полностью убираем parse_mode из запроса для совместимости
             payload = {
                 "chat_id": chat_id,
@@ -53,12 +103,12 @@ class TelegramNotifier:
                 "disable_notification": disable_notification
             }
 
-            logger.debug(f"Отправка сообщения в Telegram (chat_id: {chat_id}, длина: {len(text)})")
+            logger.debug("Отправка сообщения в Telegram (chat_id: %s, длина: %d)", chat_id, len(text))
 
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._post_json(url, payload)
             response.raise_for_status()
 
-            logger.debug(f"Сообщение успешно отправлено в Telegram (chat_id: {chat_id})")
+            logger.debug("Сообщение успешно отправлено в Telegram (chat_id: %s)", chat_id)
             return True
 
         except requests.exceptions.HTTPError as e:
@@ -75,23 +125,9 @@ class TelegramNotifier:
             # Обрабатываем специфичные ошибки Telegram API
             if e.response.status_code == 403:
                 logger.warning(f"Бот заблокирован пользователем (chat_id: {chat_id})")
+                self._blocked_chats.add(chat_id)
             elif e.response.status_code == 400:
                 logger.error(f"Некорректный запрос для chat_id {chat_id}: {e}")
-                # Пробуем отправить без parse_mode, если была проблема с форматированием
-                if self.parse_mode is not None:
-                    logger.info(f"Повторная попытка без parse_mode для chat_id {chat_id}")
-                    try:
-                        payload_no_parse = {
-                            "chat_id": chat_id,
-                            "text": text,
-                            "disable_notification": disable_notification
-                        }
-                        response_retry = requests.post(url, json=payload_no_parse, timeout=10)
-                        response_retry.raise_for_status()
-                        logger.info(f"Сообщение успешно отправлено без parse_mode (chat_id: {chat_id})")
-                        return True
-                    except Exception as retry_e:
-                        logger.error(f"Повторная попытка также неудачна: {retry_e}")
             else:
                 logger.error(f"HTTP ошибка при отправке сообщения (chat_id: {chat_id}): {e}")
             return False
@@ -102,6 +138,24 @@ class TelegramNotifier:
             logger.error(f"Неожиданная ошибка при отправке в Telegram (chat_id: {chat_id}): {e}")
             return False
     
+    def _post_json(self, url: str, payload: Dict[str, Any]) -> requests.Response:
+        """
+        Отправляет POST запрос с JSON телом.
+
+        При наличии orjson тело сериализуется в UTF-8 без экранирования
+        кириллицы, что быстрее и уменьшает размер запроса.
+
+        Args:
+            url: URL метода API
+            payload: Тело запроса
+
+        Returns:
+            Ответ сервера
+        """
+        if ORJSON_AVAILABLE:
+            return self.session.post(url, data=orjson.dumps(payload), headers=_JSON_HEADERS, timeout=10)
+        return self.session.post(url, json=payload, timeout=10)
+
     def send_message_to_all(self, chat_ids: List[int], text: str, disable_notification: bool = False) -> Dict[int, bool]:
         """
         Отправляет сообщение нескольким пользователям.
@@ -114,22 +168,12 @@ class TelegramNotifier:
         Returns:
             Словарь {chat_id: success} с результатами отправки
         """
-        import time
-        import os
-        
         results = {}
         successful = 0
         failed = 0
         
         logger.info(f"Отправка сообщения {len(chat_ids)} пользователям...")
         
-        # Оптимизация: добавляем задержку между отправками для снижения нагрузки на API
-        # Telegram API имеет лимит: 30 сообщений в секунду для бота
-        # Используем задержку 0.05 секунды (20 сообщений в секунду) для безопасности
-        # Для контейнера используем ANALYZER_TELEGRAM_DELAY, если установлена
-        delay_between_messages = float(os.getenv("ANALYZER_TELEGRAM_DELAY",
-                                                os.getenv("TELEGRAM_SEND_DELAY", "0.05")))
-        
         for idx, chat_id in enumerate(chat_ids):
             success = self.send_message(chat_id, text, disable_notification)
             results[chat_id] = success
@@ -140,11 +184,119 @@ class TelegramNotifier:
             
             # Добавляем задержку между отправками (кроме последнего сообщения)
             if idx < len(chat_ids) - 1:
-                time.sleep(delay_between_messages)
+                time.sleep(self._delay_between_messages)
         
         logger.info(f"Отправка завершена: успешно {successful}, ошибок {failed}")
         return results
     
+    def copy_message(
+        self,
+        chat_id: int,
+        from_chat_id: int,
+        message_id: int,
+        disable_notification: bool = False
+    ) -> bool:
+        """
+        Копирует уже отправленное сообщение в другой чат (метод copyMessage).
+
+        Args:
+            chat_id: ID чата назначения
+            from_chat_id: ID чата с исходным сообщением
+            message_id: ID исходного сообщения
+            disable_notification: Отключить уведомление
+
+        Returns:
+            True если успешно, False в противном случае
+        """
+        if chat_id in self._blocked_chats:
+            logger.debug("Пропуск копирования: бот заблокирован пользователем (chat_id: %s)", chat_id)
+            return False
+
+        payload = {
+            "chat_id": chat_id,
+            "from_chat_id": from_chat_id,
+            "message_id": message_id,
+            "disable_notification": disable_notification
+        }
+
+        try:
+            response = self._post_json(self._copy_message_url, payload)
+            response.raise_for_status()
+            return True
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 403:
+                logger.warning(f"Бот заблокирован пользователем (chat_id: {chat_id})")
+                self._blocked_chats.add(chat_id)
+            else:
+                logger.warning(f"Не удалось скопировать сообщение (chat_id: {chat_id}): {e}")
+            return False
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Ошибка сети при копировании сообщения (chat_id: {chat_id}): {e}")
+            return False
+
+    def send_message_to_all_via_copy(
+        self,
+        source_chat_id: int,
+        chat_ids: List[int],
+        text: str,
+        disable_notification: bool = False
+    ) -> Dict[int, bool]:
+        """
+        Отправляет сообщение нескольким пользователям через copyMessage.
+
+        Сообщение отправляется один раз в служебный чат (например, чат владельца),
+        после чего каждому получателю копируется по message_id. Запрос на
+        копирование не содержит текста, поэтому для длинных сообщений он заметно
+        меньше. Если копирование не удалось, используется обычный sendMessage.
+
+        Args:
+            source_chat_id: ID служебного чата для исходного сообщения
+            chat_ids: Список ID чатов для отправки
+            text: Текст сообщения
+            disable_notification: Отключить уведомление
+
+        Returns:
+            Словарь {chat_id: success} с результатами отправки
+        """
+        payload = {
+            "chat_id": source_chat_id,
+            "text": text,
+            "disable_notification": True
+        }
+
+        try:
+            response = self._post_json(self._send_message_url, payload)
+            response.raise_for_status()
+            message_id = response.json()["result"]["message_id"]
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Не удалось отправить исходное сообщение для копирования: {e}. "
+                           f"Используется обычная рассылка")
+            return self.send_message_to_all(chat_ids, text, disable_notification)
+
+        results = {}
+        successful = 0
+        failed = 0
+
+        logger.info(f"Копирование сообщения {len(chat_ids)} пользователям...")
+
+        for idx, chat_id in enumerate(chat_ids):
+            success = self.copy_message(chat_id, source_chat_id, message_id, disable_notification)
+            if not success and chat_id not in self._blocked_chats:
+                # Копирование может быть запрещено - отправляем текст напрямую
+                success = self.send_message(chat_id, text, disable_notification)
+            results[chat_id] = success
+            if success:
+                successful += 1
+            else:
+                failed += 1
+
+            # Добавляем задержку между отправками (кроме последнего сообщения)
+            if idx < len(chat_ids) - 1:
+                time.sleep(self._delay_between_messages)
+
+        logger.info(f"Копирование завершено: успешно {successful}, ошибок {failed}")
+        return results
+
     def send_report(self, chat_id: int, report_path: Path) -> bool:
         """
         Отправляет отчет из JSON файла в Telegram конкретному пользователю.
@@ -157,12 +309,8 @@ class TelegramNotifier:
             True если успешно, False в противном случае
         """
         try:
-            # Загружаем отчет
-            with open(report_path, "r", encoding="utf-8") as f:
-                report = json.load(f)
-            
-            # Форматируем сообщение
-            message = self._format_report_message(report)
+            # Загружаем отчет и форматируем сообщение (с кэшированием)
+            _, message = self._load_report(report_path)
             
             # Отправляем
             return self.send_message(chat_id, message)
@@ -189,12 +337,8 @@ class TelegramNotifier:
             Словарь {chat_id: success} с результатами отправки
         """
         try:
-            # Загружаем отчет один раз
-            with open(report_path, "r", encoding="utf-8") as f:
-                report = json.load(f)
-            
-            # Форматируем сообщение один раз
-            message = self._format_report_message(report)
+            # Загружаем отчет и форматируем сообщение один раз
+            _, message = self._load_report(report_path)
             
             # Отправляем всем пользователям
             return self.send_message_to_all(chat_ids, message)
@@ -209,6 +353,43 @@ class TelegramNotifier:
             logger.error(f"Ошибка при отправке отчета: {e}")
             return {}
     
+    def _load_report(self, report_path: Path) -> Tuple[Dict[str, Any], str]:
+        """
+        Загружает отчет и форматирует сообщение, используя кэш.
+
+        Повторная загрузка выполняется только если файл изменился
+        (по времени модификации и размеру).
+
+        Args:
+            report_path: Путь к JSON файлу отчета
+
+        Returns:
+            Кортеж (отчет, отформатированное сообщение)
+        """
+        st = os.stat(report_path)
+        key = (str(report_path), st.st_mtime_ns, st.st_size)
+
+        cached = self._report_cache.get(key)
+        if cached is not None:
+            logger.debug("Отчет взят из кэша: %s", report_path)
+            return cached
+
+        # orjson разбирает байты напрямую и заметно быстрее stdlib json;
+        # orjson.JSONDecodeError наследуется от json.JSONDecodeError
+        if ORJSON_AVAILABLE:
+            report = orjson.loads(Path(report_path).read_bytes())
+        else:
+            with open(report_path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+        message = self._format_report_message(report)
+
+        # Вытесняем самую старую запись при превышении лимита
+        if len(self._report_cache) >= _REPORT_CACHE_SIZE:
+            self._report_cache.pop(next(iter(self._report_cache)))
+        self._report_cache[key] = (report, message)
+
+        return report, message
+
     def _format_report_message(self, report: Dict[str, Any]) -> str:
         """
         Форматирует отчет в текстовое сообщение для Telegram.
@@ -266,7 +447,7 @@ class TelegramNotifier:
             lines.append("⚠️ Темы не найдены")
         
         # Подвал
-        lines.append("─" * 7)
+        lines.append(_SEP_DASH)
         lines.append("_Автоматический анализ новостей_")
         
         return "\n".join(lines)
@@ -292,41 +473,26 @@ class TelegramNotifier:
             logger.info("Отправка одним сообщением")
             return self.send_message(chat_id, summary_text)
         else:
-            # Разбиваем на части по строкам для надежности
+            # Разбиваем на части по строкам для надежности.
+            # Количество частей считаем заранее без построения строк,
+            # а сами части формируем и отправляем по одной
+            # Бюджет части заранее учитывает длину заголовка "Часть i/n",
+            # поэтому часть с заголовком никогда не превышает лимит
             logger.info("Разбиение на части...")
-            parts = []
-            current_part = ""
-
-            for line in summary_text.split("\n"):
-                # Проверяем, не превысит ли добавление строки лимит
-                # Добавляем 1 для символа новой строки
-                if len(current_part) + len(line) + 1 > max_length_per_part:
-                    if current_part:  # Не добавляем пустые части
-                        parts.append(current_part)
-                    current_part = line + "\n"
-                else:
-                    current_part += line + "\n"
-
-            if current_part:  # Добавляем последнюю часть
-                parts.append(current_part)
+            part_budget = max_length_per_part - _PART_HEADER_RESERVE
+            parts_count = self._count_split_parts(summary_text, part_budget)
 
-            logger.info(f"Создано {len(parts)} частей для отправки")
+            logger.info(f"Создано {parts_count} частей для отправки")
 
             # Отправляем все части
             success = True
-            for i, part in enumerate(parts, 1):
-                if len(parts) > 1:
+            for i, part in enumerate(self._iter_split(summary_text, part_budget), 1):
+                if parts_count > 1:
                     # Убираем эмодзи и Markdown из заголовков частей для надежности
-                    part_header = f"Часть {i}/{len(parts)}\n\n"
-                    # Проверяем, чтобы общая длина части с заголовком не превышала лимит
-                    if len(part_header) + len(part) > 3500:  # Консервативный лимит Telegram
-                        # Если часть все еще слишком длинная, обрезаем ее
-                        part = part[:3500 - len(part_header) - 50] + "\n\n[Сообщение было обрезано]"
-                        logger.warning(f"Часть {i} была обрезана из-за превышения лимита Telegram.")
-                    part = part_header + part
-                    logger.info(f"Отправка части {i}/{len(parts)} (длина: {len(part)})")
+                    part = f"Часть {i}/{parts_count}\n\n" + part
+                    logger.info("Отправка части %d/%d (длина: %d)", i, parts_count, len(part))
                 else:
-                    logger.info(f"Отправка единственной части (длина: {len(part)})")
+                    logger.info("Отправка единственной части (длина: %d)", len(part))
 
                 if not self.send_message(chat_id, part):
                     success = False
@@ -334,6 +500,93 @@ class TelegramNotifier:
 
             return success
 
+    @staticmethod
+    def _iter_lines(text: str) -> Iterator[str]:
+        """Лениво перебирает строки текста (аналог text.split("\\n"))."""
+        start = 0
+        while True:
+            end = text.find("\n", start)
+            if end == -1:
+                yield text[start:]
+                return
+            yield text[start:end]
+            start = end + 1
+
+    def _iter_packable_lines(self, text: str, max_length: int) -> Iterator[str]:
+        """
+        Перебирает строки текста, разрезая строки длиннее части.
+
+        Каждая выданная строка вместе с символом новой строки
+        помещается в часть длиной max_length.
+
+        Args:
+            text: Текст для разбиения
+            max_length: Максимальная длина одной части
+
+        Yields:
+            Строки текста длиной не более max_length - 1
+        """
+        width = max(max_length - 1, 1)
+        for line in self._iter_lines(text):
+            if len(line) <= width:
+                yield line
+            else:
+                for start in range(0, len(line), width):
+                    yield line[start:start + width]
+
+    def _iter_split(self, text: str, max_length: int) -> Iterator[str]:
+        """
+        Разбивает текст на части по строкам, выдавая части по одной.
+
+        Args:
+            text: Текст для разбиения
+            max_length: Максимальная длина одной части
+
+        Yields:
+            Части текста
+        """
+        current_part = ""
+
+        for line in self._iter_packable_lines(text, max_length):
+            # Проверяем, не превысит ли добавление строки лимит
+            # Добавляем 1 для символа новой строки
+            if len(current_part) + len(line) + 1 > max_length:
+                if current_part:  # Не добавляем пустые части
+                    yield current_part
+                current_part = line + "\n"
+            else:
+                current_part += line + "\n"
+
+        if current_part:  # Добавляем последнюю часть
+            yield current_part
+
+    def _count_split_parts(self, text: str, max_length: int) -> int:
+        """
+        Считает количество частей, которое выдаст _iter_split, не строя строки.
+
+        Args:
+            text: Текст для разбиения
+            max_length: Максимальная длина одной части
+
+        Returns:
+            Количество частей
+        """
+        count = 0
+        current_length = 0
+
+        for line in self._iter_packable_lines(text, max_length):
+            if current_length + len(line) + 1 > max_length:
+                if current_length:
+                    count += 1
+                current_length = len(line) + 1
+            else:
+                current_length += len(line) + 1
+
+        if current_length:
+            count += 1
+
+        return count
+
     def send_themes_separately(
         self,
         chat_id: int,
@@ -352,30 +605,83 @@ class TelegramNotifier:
             analysis_date: Дата анализа
             clustering_metrics: Метрики кластеризации
 
+        Returns:
+            True если успешно, False в противном случае
+        """
+        results = self.send_themes_separately_to_all(
+            [chat_id], narratives, total_news, analysis_date, clustering_metrics
+        )
+        return results.get(chat_id, False)
+
+    def send_themes_separately_to_all(
+        self,
+        chat_ids: List[int],
+        narratives: List[Dict[str, Any]],
+        total_news: int,
+        analysis_date: datetime,
+        clustering_metrics: Optional[Dict[str, Any]] = None
+    ) -> Dict[int, bool]:
+        """
+        Отправляет каждую тему отдельным сообщением нескольким пользователям.
+
+        Сообщения форматируются один раз и переиспользуются для всех чатов.
+
+        Args:
+            chat_ids: Список ID чатов для отправки
+            narratives: Список нарративов
+            total_news: Общее количество новостей
+            analysis_date: Дата анализа
+            clustering_metrics: Метрики кластеризации
+
+        Returns:
+            Словарь {chat_id: success} с результатами отправки
+        """
+        try:
+            # Заголовок с общей информацией, затем каждая тема отдельно
+            header_text = self._format_analysis_header(total_news, len(narratives), analysis_date, clustering_metrics)
+            theme_texts = [
+                self._format_single_theme(narrative, idx)
+                for idx, narrative in enumerate(narratives, 1)
+            ]
+        except Exception as e:
+            logger.error(f"Ошибка при форматировании тем: {e}")
+            return {chat_id: False for chat_id in chat_ids}
+
+        return {
+            chat_id: self._send_themes_to_chat(chat_id, header_text, theme_texts)
+            for chat_id in chat_ids
+        }
+
+    def _send_themes_to_chat(self, chat_id: int, header_text: str, theme_texts: List[str]) -> bool:
+        """
+        Отправляет заранее отформатированные заголовок и темы в один чат.
+
+        Args:
+            chat_id: ID чата для отправки
+            header_text: Текст заголовка анализа
+            theme_texts: Тексты тем
+
         Returns:
             True если успешно, False в противном случае
         """
         try:
-            logger.info(f"Отправка {len(narratives)} тем отдельными сообщениями")
+            logger.info(f"Отправка {len(theme_texts)} тем отдельными сообщениями")
 
             # Сначала отправляем заголовок с общей информацией
-            header_text = self._format_analysis_header(total_news, len(narratives), analysis_date, clustering_metrics)
             if not self.send_message(chat_id, header_text):
                 logger.error("Не удалось отправить заголовок анализа")
                 return False
 
             # Затем отправляем каждую тему отдельно
-            for idx, narrative in enumerate(narratives, 1):
-                theme_text = self._format_single_theme(narrative, idx)
+            for idx, theme_text in enumerate(theme_texts, 1):
                 if not self.send_message(chat_id, theme_text):
                     logger.error(f"Не удалось отправить тему #{idx}")
                     return False
 
                 # Небольшая задержка между сообщениями
-                import time
                 time.sleep(0.1)
 
-            logger.info(f"Успешно отправлено {len(narratives)} тем")
+            logger.info(f"Успешно отправлено {len(theme_texts)} тем")
             return True
 
         except Exception as e:
@@ -391,9 +697,9 @@ class TelegramNotifier:
     ) -> str:
         """Форматирует заголовок анализа."""
         lines = []
-        lines.append("=" * 60)
+        lines.append(_SEP_EQ)
         lines.append(f"КАРТА ДНЯ - {analysis_date.strftime('%d.%m.%Y')}")
-        lines.append("=" * 60)
+        lines.append(_SEP_EQ)
         lines.append("")
         lines.append(f"Всего новостей: {total_news}")
         lines.append(f"Выявлено тем: {themes_count}")
@@ -410,37 +716,37 @@ class TelegramNotifier:
 
         lines.append("")
         lines.append("Каждая тема будет отправлена отдельным сообщением.")
-        lines.append("=" * 60)
+        lines.append(_SEP_EQ)
 
         return "\n".join(lines)
 
     def _format_single_theme(self, narrative: Dict[str, Any], theme_number: int) -> str:
         """Форматирует одну тему для отправки."""
-        lines = []
-
         size = narrative.get('size', 0)
         keywords = narrative.get('keywords', [])[:5]
         news_examples = narrative.get('news_examples', [])[:3]  # Показываем до 3 примеров
 
-        lines.append(f"ТЕМА #{theme_number} (новостей: {size})")
-        lines.append("-" * 60)
-        lines.append(f"Ключевые слова: {', '.join(keywords)}")
-        lines.append("")
-        lines.append("Примеры новостей:")
-
-        for news_item in news_examples:
-            title = news_item.get('title', '')
-            source_name = news_item.get('source_name', 'Неизвестный источник')
-            link = news_item.get('link', '')
-
-            lines.append(title)
-            lines.append(source_name)
-            lines.append(link)
-            lines.append("")
-
-        return "\n".join(lines)
-
-    def _split_by_topics(self, text: str, max_length: int) -> List[str]:
+        example_lines = [
+            line
+            for news_item in news_examples
+            for line in (
+                news_item.get('title', ''),
+                news_item.get('source_name', 'Неизвестный источник'),
+                news_item.get('link', ''),
+                "",
+            )
+        ]
+
+        return "\n".join((
+            f"ТЕМА #{theme_number} (новостей: {size})",
+            _SEP_MINUS,
+            f"Ключевые слова: {', '.join(keywords)}",
+            "",
+            "Примеры новостей:",
+            *example_lines,
+        ))
+
+    def _split_by_topics(self, text: str, max_length: int) -> Iterator[str]:
         """
         Разбивает текст на части по темам для лучшей читаемости.
 
@@ -448,31 +754,27 @@ class TelegramNotifier:
             text: Полный текст отчета
             max_length: Максимальная длина одной части
 
-        Returns:
-            Список частей текста
+        Yields:
+            Части текста
         """
-        lines = text.split('\n')
-        parts = []
         current_part = ""
 
-        for line in lines:
+        for line in self._iter_lines(text):
             # Если это начало новой темы
-            if line.startswith('ТЕМА #') or line.startswith('============================================================'):
+            if line.startswith('ТЕМА #') or line.startswith(_SEP_EQ):
                 # Если текущая часть не пустая и достаточно большая, сохраняем её
                 if current_part and len(current_part) > max_length * 0.7:
-                    parts.append(current_part.rstrip())
+                    yield current_part.rstrip()
                     current_part = ""
 
             # Добавляем строку к текущей части
             if len(current_part) + len(line) + 1 > max_length:
                 if current_part:
-                    parts.append(current_part.rstrip())
+                    yield current_part.rstrip()
                 current_part = line + "\n"
             else:
                 current_part += line + "\n"
 
         # Добавляем последнюю часть
         if current_part:
-            parts.append(current_part.rstrip())
-
-        return parts
+            yield current_part.rstrip()
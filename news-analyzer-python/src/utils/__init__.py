@@ -1,6 +1,6 @@
 """Утилиты для работы с логами и вспомогательными функциями."""
 
-from .logger import setup_logger, get_logger
+from .logger import setup_logger, get_logger, get_structured_logger
 from .helpers import ensure_dir, format_datetime
 
-__all__ = ["setup_logger", "get_logger", "ensure_dir", "format_datetime"]
+__all__ = ["setup_logger", "get_logger", "get_structured_logger", "ensure_dir", "format_datetime"]
@@ -8,6 +8,9 @@ from typing import Union
 def ensure_dir(path: Union[str, Path]) -> Path:
     """
     Создает директорию, если она не существует.
+
+    Существование проверяется при каждом вызове, поэтому удаленная между
+    вызовами директория (ротация, очистка tmp) создается заново.
     
     Args:
         path: Путь к директории
@@ -16,11 +19,16 @@ def ensure_dir(path: Union[str, Path]) -> Path:
         Path: Путь к директории
     """
     dir_path = Path(path)
-    dir_path.mkdir(parents=True, exist_ok=True)
+    # Один stat дешевле mkdir, который для существующей директории завершается ошибкой
+    if not dir_path.is_dir():
+        dir_path.mkdir(parents=True, exist_ok=True)
     return dir_path
 
 
-def format_datetime(dt: datetime, fmt: str = "%Y-%m-%d %H:%M:%S") -> str:
+DEFAULT_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_datetime(dt: datetime, fmt: str = DEFAULT_DATETIME_FORMAT) -> str:
     """
     Форматирует datetime в строку.
     
@@ -31,4 +39,8 @@ def format_datetime(dt: datetime, fmt: str = "%Y-%m-%d %H:%M:%S") -> str:
     Returns:
         Отформатированная строка
     """
+    # Для aware datetime isoformat добавил бы смещение пояса
+    if fmt == DEFAULT_DATETIME_FORMAT and dt.tzinfo is None:
+        # isoformat заметно быстрее strftime и дает тот же результат
+        return dt.isoformat(sep=" ", timespec="seconds")
     return dt.strftime(fmt)
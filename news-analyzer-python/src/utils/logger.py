@@ -1,47 +1,271 @@
-"""Настройка логирования для приложения."""
+"""Настройка логирования для приложения.
 
+StructuredLogger проверяет уровень до сборки дополнительных полей и передает
+аргументы форматирования в logging, поэтому отключенные записи почти ничего
+не стоят. Для очень горячих участков можно дополнительно использовать
+модульный флаг: ``DEBUG and logger.debug("...", value)``.
+"""
+
+import atexit
+import copy
+import functools
 import logging
+import logging.handlers
+import math
+import queue
 import sys
 import json
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from .helpers import ensure_dir
 
 
 _logger: Optional[logging.Logger] = None
 
+# Уровни логирования по именам
+_LEVELS = {
+    "NOTSET": logging.NOTSET,
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARN": logging.WARNING,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "FATAL": logging.CRITICAL,
+    "CRITICAL": logging.CRITICAL,
+}
+
+# Фоновые потоки записи логов по именам логгеров
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+
+# Параметры, с которыми настроены логгеры
+_logger_configs: Dict[str, tuple] = {}
+
+# Структурированные логгеры по именам
+_structured_loggers: Dict[str, "StructuredLogger"] = {}
+
+
+def _stop_listeners():
+    """Останавливает фоновые потоки записи, дописывая оставшиеся записи."""
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
+
+
+atexit.register(_stop_listeners)
+
+
+def _unknown_caller(logger: logging.Logger, stack_info: bool = False, stacklevel: int = 1):
+    """
+    Заглушка Logger.findCaller без обхода стека вызовов.
+
+    Если запрошен stack_info, стек нужен самой записи: вызывается настоящий
+    findCaller (stacklevel + 1 пропускает кадр этой функции).
+    """
+    if stack_info:
+        return logging.Logger.findCaller(logger, stack_info, stacklevel + 1)
+    return "(unknown file)", 0, "(unknown function)", None
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, сохраняющий исключение для форматтеров в потоке записи."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Подставляет аргументы в сообщение, не форматируя запись целиком."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Базовые поля JSON записи; остальные поля дописываются после них
+_BASE_FIELDS = frozenset(("timestamp", "level", "logger", "message"))
+
+# Переиспользуемые буферы сериализации (по одному на поток)
+_json_buffers = threading.local()
+
 
 class JSONFormatter(logging.Formatter):
     """JSON formatter для структурированного логирования."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Закодированный фрагмент '"level":...,"logger":...,"message":' по (уровень, логгер)
+        self._prefix_cache: Dict[Tuple[str, str], bytes] = {}
+        # Последняя отформатированная секунда: (секунда, строка)
+        self._second_cache: Tuple[int, str] = (-1, "")
+
+    def _format_timestamp(self, created: float) -> str:
+        """
+        Форматирует время записи как datetime.fromtimestamp(created).isoformat().
+
+        Строка с точностью до секунды кэшируется, поэтому записи в пределах
+        одной секунды добавляют только микросекунды.
+        """
+        fraction, whole = math.modf(created)
+        second = int(whole)
+        microsecond = round(fraction * 1e6)
+        if microsecond >= 1000000:
+            second += 1
+            microsecond -= 1000000
+
+        cached_second, cached_str = self._second_cache
+        if cached_second != second:
+            cached_str = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+            self._second_cache = (second, cached_str)
+
+        if microsecond:
+            return f"{cached_str}.{microsecond:06d}"
+        return cached_str
+
     def format(self, record: logging.LogRecord) -> str:
         """Форматирует запись лога в JSON."""
-        # Базовые поля
-        log_entry = {
-            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
-            "level": record.levelname,
-            "logger": record.name,
-            "message": record.getMessage(),
-        }
+        timestamp = self._format_timestamp(record.created)
+        message = record.getMessage()
+
+        # Поля после базовых: extra, исключение, стандартные поля
+        fields: Dict[str, Any] = {}
 
         # Добавляем дополнительные поля из extra
-        if hasattr(record, 'extra_fields'):
-            log_entry.update(record.extra_fields)
+        extra_fields = record.__dict__.get('extra_fields')
+        if extra_fields is not None:
+            fields.update(extra_fields)
 
         # Добавляем информацию об исключении
         if record.exc_info:
-            log_entry["exception"] = self.formatException(record.exc_info)
+            fields["exception"] = self.formatException(record.exc_info)
+
+        # Добавляем стандартные поля Python logging, если они заполнены
+        # (атрибуты всегда есть у LogRecord, getattr не нужен)
+        if record.filename:
+            fields["filename"] = record.filename
+        if record.lineno:
+            fields["lineno"] = record.lineno
+        if record.funcName:
+            fields["funcName"] = record.funcName
+        if record.module:
+            fields["module"] = record.module
+
+        # Если extra переопределяет базовые поля, собираем запись целиком
+        if ORJSON_AVAILABLE and _BASE_FIELDS.isdisjoint(fields):
+            return self._encode(record, timestamp, message, fields)
 
-        # Добавляем стандартные поля Python logging, если они есть
-        standard_fields = ['filename', 'lineno', 'funcName', 'module']
-        for field in standard_fields:
-            value = getattr(record, field, None)
-            if value:
-                log_entry[field] = value
+        # Базовые поля
+        log_entry = {
+            "timestamp": timestamp,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": message,
+        }
+        log_entry.update(fields)
 
+        if ORJSON_AVAILABLE:
+            # orjson сериализует сразу в UTF-8 и в разы быстрее stdlib json
+            return orjson.dumps(log_entry, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
         return json.dumps(log_entry, ensure_ascii=False)
 
+    def _encode(self, record: logging.LogRecord, timestamp: str, message: str, fields: Dict[str, Any]) -> str:
+        """
+        Собирает JSON из заранее закодированного префикса и переменных частей.
+
+        Результат совпадает с сериализацией словаря с базовыми полями.
+        """
+        key = (record.levelname, record.name)
+        prefix = self._prefix_cache.get(key)
+        if prefix is None:
+            prefix = (
+                b',"level":' + orjson.dumps(record.levelname)
+                + b',"logger":' + orjson.dumps(record.name)
+                + b',"message":'
+            )
+            self._prefix_cache[key] = prefix
+
+        buf = getattr(_json_buffers, "buf", None)
+        if buf is None:
+            buf = _json_buffers.buf = bytearray()
+        del buf[:]
+
+        buf += b'{"timestamp":'
+        buf += orjson.dumps(timestamp)
+        buf += prefix
+        buf += orjson.dumps(message)
+        if fields:
+            # Отбрасываем открывающую скобку сериализованного словаря
+            buf += b","
+            buf += orjson.dumps(fields, option=orjson.OPT_NON_STR_KEYS)[1:]
+        else:
+            buf += b"}"
+
+        return buf.decode("utf-8")
+
+
+class BufferedFileHandler(logging.StreamHandler):
+    """Файловый обработчик с буферизованной записью и периодическим сбросом буфера."""
+
+    def __init__(
+        self,
+        filename: Path,
+        encoding: str = "utf-8",
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 0.5
+    ):
+        """
+        Инициализация обработчика.
+
+        Args:
+            filename: Путь к файлу лога
+            encoding: Кодировка файла
+            buffer_size: Размер буфера записи в байтах
+            flush_interval: Интервал сброса буфера на диск в секундах
+        """
+        self.baseFilename = os.path.abspath(filename)
+        super().__init__(open(self.baseFilename, "a", encoding=encoding, buffering=buffer_size))
+        self._flush_stop = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically,
+            args=(flush_interval,),
+            name="log-flush",
+            daemon=True
+        )
+        self._flush_thread.start()
+
+    def emit(self, record: logging.LogRecord):
+        """Записывает запись в буфер без немедленного сброса на диск."""
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _flush_periodically(self, interval: float):
+        """Периодически сбрасывает буфер на диск."""
+        while not self._flush_stop.wait(interval):
+            self.flush()
+
+    def close(self):
+        """Сбрасывает буфер и закрывает файл."""
+        self._flush_stop.set()
+        self.acquire()
+        try:
+            stream = self.stream
+            self.stream = None
+            if stream is not None:
+                stream.flush()
+                stream.close()
+        finally:
+            self.release()
+            super().close()
+
 
 class StructuredLogger:
     """Структурированный логгер с поддержкой дополнительных полей."""
@@ -49,36 +273,40 @@ class StructuredLogger:
     def __init__(self, logger: logging.Logger):
         self.logger = logger
 
-    def _log(self, level: int, message: str, extra: Optional[Dict[str, Any]] = None):
+    def _log(self, level: int, message: str, args: tuple, extra: Optional[Dict[str, Any]] = None):
         """Внутренний метод логирования."""
+        if not self.logger.isEnabledFor(level):
+            return
+        # Уровень уже проверен: вызываем Logger._log напрямую, минуя
+        # повторные проверки в Logger.log
         if extra:
-            self.logger.log(level, message, extra={"extra_fields": extra})
+            self.logger._log(level, message, args, extra={"extra_fields": extra})
         else:
-            self.logger.log(level, message)
+            self.logger._log(level, message, args)
 
-    def debug(self, message: str, **kwargs):
+    def debug(self, message: str, *args, **kwargs):
         """DEBUG уровень логирования."""
-        self._log(logging.DEBUG, message, kwargs)
+        self._log(logging.DEBUG, message, args, kwargs)
 
-    def info(self, message: str, **kwargs):
+    def info(self, message: str, *args, **kwargs):
         """INFO уровень логирования."""
-        self._log(logging.INFO, message, kwargs)
+        self._log(logging.INFO, message, args, kwargs)
 
-    def warning(self, message: str, **kwargs):
+    def warning(self, message: str, *args, **kwargs):
         """WARNING уровень логирования."""
-        self._log(logging.WARNING, message, kwargs)
+        self._log(logging.WARNING, message, args, kwargs)
 
-    def error(self, message: str, **kwargs):
+    def error(self, message: str, *args, **kwargs):
         """ERROR уровень логирования."""
-        self._log(logging.ERROR, message, kwargs)
+        self._log(logging.ERROR, message, args, kwargs)
 
-    def critical(self, message: str, **kwargs):
+    def critical(self, message: str, *args, **kwargs):
         """CRITICAL уровень логирования."""
-        self._log(logging.CRITICAL, message, kwargs)
+        self._log(logging.CRITICAL, message, args, kwargs)
 
-    def exception(self, message: str, **kwargs):
+    def exception(self, message: str, *args, **kwargs):
         """Логирование исключения с traceback."""
-        self.logger.exception(message, extra={"extra_fields": kwargs} if kwargs else None)
+        self.logger.exception(message, *args, extra={"extra_fields": kwargs} if kwargs else None)
 
 
 def setup_logger(
@@ -104,15 +332,37 @@ def setup_logger(
     global _logger
 
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
-
-    # Очищаем существующие обработчики
-    logger.handlers.clear()
+    level = _LEVELS.get(log_level)
+    if level is None:
+        level = _LEVELS.get(log_level.upper(), logging.INFO)
 
     # Определяем формат логов
     if json_format is None:
         json_format = os.getenv("LOG_FORMAT", "").upper() == "JSON"
 
+    # Логгер уже настроен с теми же параметрами - ничего не пересоздаем
+    config_key = (level, log_dir if log_to_file else None, json_format)
+    if _logger_configs.get(name) == config_key and name in _listeners and logger.handlers:
+        _logger = logger
+        return logger
+
+    logger.setLevel(level)
+
+    # Очищаем существующие обработчики и останавливаем прежний поток записи
+    logger.handlers.clear()
+    previous_listener = _listeners.pop(name, None)
+    if previous_listener is not None:
+        previous_listener.stop()
+        for handler in previous_listener.handlers:
+            handler.close()
+
+    # Источник вызова (файл, строка, функция) нужен только JSON формату;
+    # для текстового формата не обходим стек на каждой записи
+    if json_format:
+        logger.__dict__.pop("findCaller", None)
+    else:
+        logger.findCaller = functools.partial(_unknown_caller, logger)
+
     if json_format:
         formatter = JSONFormatter()
     else:
@@ -125,16 +375,25 @@ def setup_logger(
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.DEBUG)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
 
     # Обработчик для файла
     if log_to_file and log_dir:
-        log_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dir(log_dir)
         log_file = log_dir / f"{name}.log"
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler = BufferedFileHandler(log_file, encoding="utf-8")
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    # Запись в консоль и файл выполняется в фоновом потоке,
+    # чтобы вызовы логирования не блокировались на вводе-выводе
+    log_queue: queue.Queue = queue.Queue(-1)
+    logger.addHandler(_QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
+    _logger_configs[name] = config_key
 
     _logger = logger
     return logger
@@ -160,11 +419,16 @@ def get_structured_logger(name: str = "news_analyzer") -> StructuredLogger:
     """
     Возвращает структурированный логгер.
 
+    Для каждого имени создается один экземпляр, повторные вызовы возвращают его же.
+
     Args:
         name: Имя логгера
 
     Returns:
         StructuredLogger
     """
-    logger = get_logger(name)
-    return StructuredLogger(logger)
+    structured_logger = _structured_loggers.get(name)
+    if structured_logger is None:
+        structured_logger = StructuredLogger(get_logger(name))
+        _structured_loggers[name] = structured_logger
+    return structured_logger
@@ -6,7 +6,19 @@
     python test_dependencies.py
 """
 
+import importlib
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def _check_import(import_name):
+    """Импортирует модуль и возвращает ошибку импорта (или None)."""
+    try:
+        importlib.import_module(import_name)
+        return None
+    except Exception as e:
+        return e
+
 
 def test_imports():
     """Проверяет импорт всех зависимостей."""
@@ -29,14 +41,25 @@ def test_imports():
     print(f"Python версия: {sys.version}")
     print("=" * 60)
     
-    for package_name, import_name in dependencies:
-        try:
-            __import__(import_name)
+    # Импортируем параллельно: загрузка расширений и чтение файлов перекрываются
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(8, len(dependencies))) as executor:
+        futures = {
+            executor.submit(_check_import, import_name): package_name
+            for package_name, import_name in dependencies
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    # Выводим результаты в исходном порядке
+    for package_name, _ in dependencies:
+        e = results[package_name]
+        if e is None:
             print(f"✅ {package_name:20s} - OK")
-        except ImportError as e:
+        elif isinstance(e, ImportError):
             print(f"❌ {package_name:20s} - ОШИБКА: {e}")
             errors.append((package_name, str(e)))
-        except Exception as e:
+        else:
             print(f"⚠️  {package_name:20s} - ПРЕДУПРЕЖДЕНИЕ: {e}")
     
     print("=" * 60)
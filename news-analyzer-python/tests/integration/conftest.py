@@ -4,10 +4,27 @@ import pytest
 from testcontainers.postgres import PostgresContainer
 from testcontainers.redis import RedisContainer
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 import redis
+import socket
 import time
 from typing import Generator, Tuple
 
+from src.db import Database
+
+
+def _wait_tcp(host: str, port: int, timeout: float = 30.0) -> None:
+    """Wait until a TCP port accepts connections."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection((host, int(port)), timeout=0.2):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
 
 @pytest.fixture(scope="session")
 def postgres_container() -> Generator[Tuple[str, str, str, str], None, None]:
@@ -22,26 +39,28 @@ def postgres_container() -> Generator[Tuple[str, str, str, str], None, None]:
 
     container.start()
 
-    # Wait for PostgreSQL to be ready
-    max_attempts = 30
+    host = container.get_container_host_ip()
+    port = container.get_exposed_port(5432)
+
+    # Wait for the port first, then for PostgreSQL to accept logins
+    _wait_tcp(host, port)
+    max_attempts = 60
     for attempt in range(max_attempts):
         try:
             conn = psycopg2.connect(
-                host=container.get_container_host_ip(),
-                port=container.get_exposed_port(5432),
+                host=host,
+                port=port,
                 user="testuser",
                 password="testpass",
-                dbname="testdb"
+                dbname="testdb",
+                connect_timeout=2
             )
             conn.close()
             break
         except psycopg2.OperationalError:
             if attempt == max_attempts - 1:
                 raise
-            time.sleep(1)
-
-    host = container.get_container_host_ip()
-    port = container.get_exposed_port(5432)
+            time.sleep(0.5)
 
     yield host, port, "testuser", "testpass"
 
@@ -58,32 +77,31 @@ def redis_container() -> Generator[Tuple[str, int], None, None]:
 
     container.start()
 
-    # Wait for Redis to be ready
-    max_attempts = 30
-    for attempt in range(max_attempts):
-        try:
-            r = redis.Redis(
-                host=container.get_container_host_ip(),
-                port=container.get_exposed_port(6379),
-                db=0
-            )
-            r.ping()
-            r.close()
-            break
-        except redis.ConnectionError:
-            if attempt == max_attempts - 1:
-                raise
-            time.sleep(1)
-
     host = container.get_container_host_ip()
     port = container.get_exposed_port(6379)
 
+    # Wait for the port first, then PING over a single client
+    _wait_tcp(host, port)
+    r = redis.Redis(host=host, port=port, db=0, socket_connect_timeout=0.2)
+    try:
+        max_attempts = 60
+        for attempt in range(max_attempts):
+            try:
+                r.execute_command("PING")
+                break
+            except (redis.ConnectionError, redis.TimeoutError):
+                if attempt == max_attempts - 1:
+                    raise
+                time.sleep(0.5)
+    finally:
+        r.close()
+
     yield host, port
 
     container.stop()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def db_config(postgres_container):
     """Database configuration for tests."""
     host, port, user, password = postgres_container
@@ -97,7 +115,57 @@ def db_config(postgres_container):
     }
 
 
+@pytest.fixture(scope="session")
+def db_pool(db_config) -> Generator[ThreadedConnectionPool, None, None]:
+    """Connection pool shared by the whole session, so handshakes happen once."""
+    pool = ThreadedConnectionPool(
+        minconn=2,
+        maxconn=8,
+        host=db_config["host"],
+        port=db_config["port"],
+        user=db_config["user"],
+        password=db_config["password"],
+        dbname=db_config["database"]
+    )
+
+    yield pool
+
+    pool.closeall()
+
+
+class _SavepointConnection:
+    """Pooled connection whose commit/rollback stay inside the test's savepoint."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def commit(self):
+        # Keep everything in the test transaction; teardown rolls it back
+        pass
+
+    def rollback(self):
+        with self._conn.cursor() as cursor:
+            cursor.execute("ROLLBACK TO SAVEPOINT test_case")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
 @pytest.fixture
+def db(db_pool, db_config) -> Generator[Database, None, None]:
+    """Database bound to a pooled connection; all its writes are rolled back after the test."""
+    conn = db_pool.getconn()
+    with conn.cursor() as cursor:
+        cursor.execute("SAVEPOINT test_case")
+
+    yield Database(db_config, connection=_SavepointConnection(conn))
+
+    # One rollback replaces per-test cleanup DELETEs
+    conn.rollback()
+    db_pool.putconn(conn)
+
+
+@pytest.fixture(scope="session")
 def redis_config(redis_container):
     """Redis configuration for tests."""
     host, port = redis_container
@@ -1,23 +1,23 @@
 """Integration tests for API endpoints."""
 
+import asyncio
 import pytest
-import requests
+import pytest_asyncio
+import httpx
 import time
 import subprocess
-import threading
 import os
 from pathlib import Path
 
 
+@pytest.mark.asyncio(loop_scope="class")
 class TestAPIEndpointsIntegration:
     """Integration tests for API endpoints using real containers."""
 
     @pytest.fixture(scope="class")
-    def api_server(self, db_config, redis_config):
-        """Start API server for testing."""
-        # Set environment variables
-        env = os.environ.copy()
-        env.update({
+    def api_env(self, db_config, redis_config):
+        """Environment variables pointing the API at the test containers."""
+        env = {
             "POSTGRES_HOST": db_config["host"],
             "POSTGRES_PORT": str(db_config["port"]),
             "POSTGRES_USER": db_config["user"],
@@ -25,9 +25,20 @@ class TestAPIEndpointsIntegration:
             "POSTGRES_DB": db_config["database"],
             "REDIS_HOST": redis_config["host"],
             "REDIS_PORT": str(redis_config["port"]),
-            "API_HOST": "127.0.0.1",
-            "API_PORT": "8888",
             "LOG_FORMAT": "json"
+        }
+        with pytest.MonkeyPatch.context() as mp:
+            for key, value in env.items():
+                mp.setenv(key, value)
+            yield env
+
+    @pytest.fixture(scope="class")
+    def api_server(self, api_env):
+        """Start API server for tests that need a real TCP listener."""
+        env = os.environ.copy()
+        env.update({
+            "API_HOST": "127.0.0.1",
+            "API_PORT": "8888"
         })
 
         # Start API server
@@ -39,18 +50,51 @@ class TestAPIEndpointsIntegration:
             stderr=subprocess.PIPE
         )
 
-        # Wait for server to start
-        time.sleep(3)
-
-        yield "http://127.0.0.1:8888"
+        base_url = "http://127.0.0.1:8888"
+
+        # Wait for server to start by polling the health endpoint
+        deadline = time.monotonic() + 30
+        delay = 0.05
+        while True:
+            if server_process.poll() is not None:
+                pytest.fail(f"API server exited with code {server_process.returncode}")
+            try:
+                if httpx.get(f"{base_url}/health", timeout=0.5).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                server_process.terminate()
+                server_process.wait()
+                pytest.fail("API server did not become ready in time")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+        yield base_url
 
         # Cleanup
         server_process.terminate()
         server_process.wait()
 
-    def test_health_endpoint(self, api_server):
+    @pytest_asyncio.fixture(scope="class", loop_scope="class")
+    async def client(self, api_env):
+        """In-process async client: requests go straight to the ASGI app, without TCP or uvicorn."""
+        from src.monitoring.api import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=5) as client:
+            yield client
+
+    @pytest_asyncio.fixture(scope="class", loop_scope="class")
+    async def tcp_client(self, api_server):
+        """Async HTTP client talking to the uvicorn server over real TCP."""
+        limits = httpx.Limits(max_connections=16, max_keepalive_connections=16)
+        async with httpx.AsyncClient(base_url=api_server, timeout=5, limits=limits) as client:
+            yield client
+
+    async def test_health_endpoint(self, client):
         """Test health endpoint."""
-        response = requests.get(f"{api_server}/health", timeout=5)
+        response = await client.get("/health")
 
         assert response.status_code == 200
         data = response.json()
@@ -62,9 +106,9 @@ class TestAPIEndpointsIntegration:
         assert "redis" in data["checks"]
         assert "nltk" in data["checks"]
 
-    def test_metrics_endpoint(self, api_server):
+    async def test_metrics_endpoint(self, client):
         """Test metrics endpoint."""
-        response = requests.get(f"{api_server}/metrics", timeout=5)
+        response = await client.get("/metrics")
 
         assert response.status_code == 200
         content_type = response.headers.get("content-type", "")
@@ -76,9 +120,9 @@ class TestAPIEndpointsIntegration:
         assert "analysis_duration_seconds" in content
         assert "clustering_quality_silhouette" in content
 
-    def test_status_endpoint(self, api_server):
+    async def test_status_endpoint(self, client):
         """Test detailed status endpoint."""
-        response = requests.get(f"{api_server}/status", timeout=5)
+        response = await client.get("/status")
 
         assert response.status_code == 200
         data = response.json()
@@ -101,9 +145,9 @@ class TestAPIEndpointsIntegration:
         assert "disk_used_percent" in system
         assert "cpu_count" in system
 
-    def test_diagnostics_endpoint(self, api_server):
+    async def test_diagnostics_endpoint(self, client):
         """Test diagnostics endpoint."""
-        response = requests.get(f"{api_server}/diagnostics", timeout=10)
+        response = await client.get("/diagnostics", timeout=10)
 
         assert response.status_code == 200
         data = response.json()
@@ -119,18 +163,18 @@ class TestAPIEndpointsIntegration:
             assert component in diagnostics
             assert "status" in diagnostics[component]
 
-    def test_analyze_endpoint_disabled(self, api_server):
+    async def test_analyze_endpoint_disabled(self, client):
         """Test that analyze endpoint returns appropriate response."""
         # This test assumes the analyze endpoint is not fully implemented
         # or requires additional setup
-        response = requests.post(f"{api_server}/analyze", timeout=5)
+        response = await client.post("/analyze")
 
         # Should not fail with 404
         assert response.status_code in [200, 400, 500]  # Various possible responses
 
-    def test_root_endpoint(self, api_server):
+    async def test_root_endpoint(self, client):
         """Test root endpoint."""
-        response = requests.get(f"{api_server}/", timeout=5)
+        response = await client.get("/")
 
         assert response.status_code == 200
         data = response.json()
@@ -140,9 +184,9 @@ class TestAPIEndpointsIntegration:
         assert "endpoints" in data
         assert data["service"] == "News Analyzer API"
 
-    def test_cors_headers(self, api_server):
+    async def test_cors_headers(self, tcp_client):
         """Test CORS headers."""
-        response = requests.options(f"{api_server}/health", timeout=5)
+        response = await tcp_client.options("/health")
 
         assert response.status_code == 200
 
@@ -152,38 +196,34 @@ class TestAPIEndpointsIntegration:
         assert "access-control-allow-methods" in headers
         assert "access-control-allow-headers" in headers
 
-    def test_json_content_type(self, api_server):
+    async def test_json_content_type(self, client):
         """Test that JSON endpoints return correct content type."""
         endpoints = ["/health", "/status", "/diagnostics", "/"]
 
-        for endpoint in endpoints:
-            response = requests.get(f"{api_server}{endpoint}", timeout=5)
+        responses = await asyncio.gather(
+            *(client.get(endpoint, timeout=10) for endpoint in endpoints)
+        )
+
+        for response in responses:
             assert response.status_code == 200
 
             content_type = response.headers.get("content-type", "")
             assert "application/json" in content_type
 
-    def test_error_handling(self, api_server):
+    async def test_error_handling(self, client):
         """Test error handling for invalid requests."""
         # Test invalid endpoint
-        response = requests.get(f"{api_server}/nonexistent", timeout=5)
+        response = await client.get("/nonexistent")
         assert response.status_code == 404
 
         # Test invalid method
-        response = requests.put(f"{api_server}/health", timeout=5)
+        response = await client.put("/health")
         assert response.status_code in [405, 404]  # Method not allowed or not found
 
-    def test_health_during_load(self, api_server):
+    async def test_health_during_load(self, client):
         """Test health endpoint under concurrent load."""
-        import concurrent.futures
-
-        def make_request():
-            return requests.get(f"{api_server}/health", timeout=5)
-
         # Make 10 concurrent requests
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(make_request) for _ in range(10)]
-            responses = [future.result() for future in concurrent.futures.as_completed(futures)]
+        responses = await asyncio.gather(*(client.get("/health") for _ in range(10)))
 
         # All requests should succeed
         for response in responses:
@@ -192,9 +232,9 @@ class TestAPIEndpointsIntegration:
             assert "status" in data
 
     @pytest.mark.parametrize("endpoint", ["/health", "/status", "/metrics", "/diagnostics"])
-    def test_endpoints_responsive(self, api_server, endpoint):
+    async def test_endpoints_responsive(self, client, endpoint):
         """Test that all main endpoints are responsive."""
-        response = requests.get(f"{api_server}{endpoint}", timeout=5)
+        response = await client.get(endpoint)
 
         # Should not be 5xx errors (server errors)
         assert response.status_code < 500
\ No newline at end of file
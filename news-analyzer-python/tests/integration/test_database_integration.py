@@ -3,10 +3,106 @@
 import pytest
 import psycopg2
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 from src.db import Database
 
 
+def _news_crud_case(db):
+    """CRUD operations for news."""
+    # Create test source
+    source_id = 999
+    db.save_source(db_source=SimpleNamespace(
+        name='Test Source',
+        url='https://test.com',
+        status='active'
+    ))
+
+    # Create test news
+    news_id = db.save_news(
+        source_id=source_id,
+        title="Test News Title",
+        description="Test news description for integration testing",
+        link="https://test.com/news/123",
+        published_at=datetime.now()
+    )
+
+    assert news_id > 0
+
+    # Read news
+    news_count = db.get_news_count_last_hours(hours=1, table_name="news")
+    assert news_count >= 1
+
+
+def _user_case(db):
+    """User-related database operations."""
+    # Test user existence check
+    exists = db.user_exists(db_conn=db.connection, chat_id=12345)
+    assert isinstance(exists, bool)
+
+    # Test saving user (if not exists)
+    test_chat_id = 999999
+    db.save_user(SimpleNamespace(
+        chat_id=test_chat_id,
+        username='testuser',
+        first_name='Test',
+        last_name='User'
+    ))
+
+    # Verify user was created
+    exists_after = db.user_exists(db_conn=db.connection, chat_id=test_chat_id)
+    assert exists_after
+
+
+def _subscription_case(db):
+    """Subscription-related database operations."""
+    # Create test user and source
+    test_chat_id = 888888
+    test_source_id = 888
+
+    db.save_user(SimpleNamespace(
+        chat_id=test_chat_id,
+        username='testuser',
+        first_name='Test',
+        last_name='User'
+    ))
+
+    db.save_source(SimpleNamespace(
+        name='Test Source',
+        url='https://test.com',
+        status='active'
+    ))
+
+    # Create subscription
+    db.save_subscription(SimpleNamespace(
+        chat_id=test_chat_id,
+        source_id=test_source_id
+    ))
+
+    # Test subscription checks
+    is_subscribed = db.is_user_subscribed(db_conn=db.connection,
+                                        chat_id=test_chat_id,
+                                        source_id=test_source_id)
+    assert is_subscribed
+
+    # Get subscriptions
+    subscriptions = db.get_user_subscriptions_with_details(db_conn=db.connection,
+                                                         chat_id=test_chat_id)
+    assert len(subscriptions) >= 1
+
+    # Delete subscription
+    db.delete_subscription(SimpleNamespace(
+        chat_id=test_chat_id,
+        source_id=test_source_id
+    ))
+
+    # Verify deletion
+    is_subscribed_after = db.is_user_subscribed(db_conn=db.connection,
+                                              chat_id=test_chat_id,
+                                              source_id=test_source_id)
+    assert not is_subscribed_after
+
+
 class TestDatabaseIntegration:
     """Integration tests for database operations with real PostgreSQL."""
 
@@ -20,234 +116,95 @@ class TestDatabaseIntegration:
 
         db.disconnect()
 
-    def test_news_crud_operations(self, db_config):
-        """Test CRUD operations for news."""
-        db = Database(db_config)
-        db.connect()
-
-        try:
-            # Create test source
-            source_id = 999
-            db.save_source(db_source=type('Source', (), {
-                'name': 'Test Source',
-                'url': 'https://test.com',
-                'status': 'active'
-            })())
-
-            # Create test news
-            news_id = db.save_news(
-                source_id=source_id,
-                title="Test News Title",
-                description="Test news description for integration testing",
-                link="https://test.com/news/123",
-                published_at=datetime.now()
-            )
-
-            assert news_id > 0
-
-            # Read news
-            news_count = db.get_news_count_last_hours(hours=1, table_name="news")
-            assert news_count >= 1
-
-            # Clean up
-            conn = db.connection
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM news WHERE id = %s", (news_id,))
-            cursor.execute("DELETE FROM sources WHERE id = %s", (source_id,))
-            conn.commit()
-
-        finally:
-            db.disconnect()
-
-    def test_user_operations(self, db_config):
-        """Test user-related database operations."""
-        db = Database(db_config)
-        db.connect()
-
-        try:
-            # Test user existence check
-            exists = db.user_exists(db_conn=db.connection, chat_id=12345)
-            assert isinstance(exists, bool)
-
-            # Test saving user (if not exists)
-            test_chat_id = 999999
-            db.save_user(type('User', (), {
-                'chat_id': test_chat_id,
-                'username': 'testuser',
-                'first_name': 'Test',
-                'last_name': 'User'
-            })())
-
-            # Verify user was created
-            exists_after = db.user_exists(db_conn=db.connection, chat_id=test_chat_id)
-            assert exists_after
-
-            # Clean up
-            conn = db.connection
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM users WHERE chat_id = %s", (test_chat_id,))
-            conn.commit()
+    @pytest.mark.parametrize(
+        "case",
+        [_news_crud_case, _user_case, _subscription_case],
+        ids=["news", "user", "subscription"]
+    )
+    def test_crud_operations(self, db, case):
+        """Test CRUD operations for news, users and subscriptions."""
+        case(db)
 
-        finally:
-            db.disconnect()
-
-    def test_subscription_operations(self, db_config):
-        """Test subscription-related database operations."""
-        db = Database(db_config)
-        db.connect()
-
-        try:
-            # Create test user and source
-            test_chat_id = 888888
-            test_source_id = 888
-
-            db.save_user(type('User', (), {
-                'chat_id': test_chat_id,
-                'username': 'testuser',
-                'first_name': 'Test',
-                'last_name': 'User'
-            })())
-
-            db.save_source(type('Source', (), {
-                'name': 'Test Source',
-                'url': 'https://test.com',
-                'status': 'active'
-            })())
-
-            # Create subscription
-            db.save_subscription(type('Subscription', (), {
-                'chat_id': test_chat_id,
-                'source_id': test_source_id
-            })())
-
-            # Test subscription checks
-            is_subscribed = db.is_user_subscribed(db_conn=db.connection,
-                                                chat_id=test_chat_id,
-                                                source_id=test_source_id)
-            assert is_subscribed
-
-            # Get subscriptions
-            subscriptions = db.get_user_subscriptions_with_details(db_conn=db.connection,
-                                                                 chat_id=test_chat_id)
-            assert len(subscriptions) >= 1
-
-            # Delete subscription
-            db.delete_subscription(type('Subscription', (), {
-                'chat_id': test_chat_id,
-                'source_id': test_source_id
-            })())
-
-            # Verify deletion
-            is_subscribed_after = db.is_user_subscribed(db_conn=db.connection,
-                                                      chat_id=test_chat_id,
-                                                      source_id=test_source_id)
-            assert not is_subscribed_after
-
-            # Clean up
-            conn = db.connection
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM users WHERE chat_id = %s", (test_chat_id,))
-            cursor.execute("DELETE FROM sources WHERE id = %s", (test_source_id,))
-            conn.commit()
-
-        finally:
-            db.disconnect()
-
-    def test_analysis_operations(self, db_config):
+    def test_analysis_operations(self, db):
         """Test analysis result storage and retrieval."""
-        db = Database(db_config)
-        db.connect()
-
-        try:
-            # Ensure analysis table exists
-            db.ensure_analysis_table_exists()
-
-            # Save analysis result
-            test_narratives = [
-                {
-                    "theme": "Test Theme",
-                    "keywords": ["test", "theme"],
-                    "size": 5,
-                    "examples": ["Example 1", "Example 2"]
-                }
-            ]
-
-            analysis_id = db.save_analysis_result(
-                analysis_date=datetime.now(),
-                total_news=10,
-                narratives=test_narratives
-            )
-
-            assert analysis_id > 0
-
-            # Retrieve analysis
-            recent_analysis = db.get_recent_analysis(hours=1)
-            assert len(recent_analysis) >= 1
-
-            # Verify the saved analysis
-            found = False
-            for analysis in recent_analysis:
-                if analysis.id == analysis_id:
-                    assert analysis.total_news == 10
-                    assert len(analysis.narratives) == 1
-                    found = True
-                    break
-
-            assert found, "Saved analysis not found"
-
-            # Clean up
-            conn = db.connection
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM news_analysis WHERE id = %s", (analysis_id,))
-            conn.commit()
-
-        finally:
-            db.disconnect()
-
-    def test_admin_statistics(self, db_config):
+        # Ensure analysis table exists
+        db.ensure_analysis_table_exists()
+
+        # Save analysis result
+        test_narratives = [
+            {
+                "theme": "Test Theme",
+                "keywords": ["test", "theme"],
+                "size": 5,
+                "examples": ["Example 1", "Example 2"]
+            }
+        ]
+
+        analysis_id = db.save_analysis_result(
+            analysis_date=datetime.now(),
+            total_news=10,
+            narratives=test_narratives
+        )
+
+        assert analysis_id > 0
+
+        # Retrieve analysis
+        recent_analysis = db.get_recent_analysis(hours=1)
+        assert len(recent_analysis) >= 1
+
+        # Verify the saved analysis
+        found = False
+        for analysis in recent_analysis:
+            if analysis.id == analysis_id:
+                assert analysis.total_news == 10
+                assert len(analysis.narratives) == 1
+                found = True
+                break
+
+        assert found, "Saved analysis not found"
+
+    def test_admin_statistics(self, db):
         """Test admin statistics retrieval."""
-        db = Database(db_config)
-        db.connect()
-
-        try:
-            # Get admin stats
-            stats = db.get_admin_stats()
-
-            # Check structure
-            assert hasattr(stats, 'total_users')
-            assert hasattr(stats, 'total_news')
-            assert hasattr(stats, 'total_sources')
+        # Get admin stats
+        stats = db.get_admin_stats()
 
-            # Values should be non-negative
-            assert stats.total_users >= 0
-            assert stats.total_news >= 0
-            assert stats.total_sources >= 0
+        # Check structure
+        assert hasattr(stats, 'total_users')
+        assert hasattr(stats, 'total_news')
+        assert hasattr(stats, 'total_sources')
 
-        finally:
-            db.disconnect()
+        # Values should be non-negative
+        assert stats.total_users >= 0
+        assert stats.total_news >= 0
+        assert stats.total_sources >= 0
 
-    def test_concurrent_connections(self, db_config):
+    def test_concurrent_connections(self, db_pool, db_config):
         """Test multiple concurrent database connections."""
         import threading
         import time
 
         results = []
         errors = []
+        # Release all workers at once so their queries are really in flight together
+        start_barrier = threading.Barrier(5, timeout=10)
 
         def worker(worker_id):
             try:
-                db = Database(db_config)
-                db.connect()
-
-                # Simple query
-                count = db.get_news_count_last_hours(hours=24, table_name="news")
-                results.append((worker_id, count))
-
-                db.disconnect()
+                # Borrow an already open connection instead of connecting per thread
+                conn = db_pool.getconn()
+                try:
+                    db = Database(db_config, connection=conn)
+                    start_barrier.wait()
+
+                    # Simple query (psycopg2 releases the GIL while waiting on the server)
+                    count = db.get_news_count_last_hours(hours=24, table_name="news")
+                    results.append((worker_id, count))
+                finally:
+                    db_pool.putconn(conn)
             except Exception as e:
                 errors.append((worker_id, str(e)))
 
-        # Start 5 concurrent connections
+        # Start 5 concurrent workers on pooled connections
         threads = []
         for i in range(5):
             t = threading.Thread(target=worker, args=(i,))
@@ -266,62 +223,69 @@ class TestDatabaseIntegration:
         counts = [r[1] for r in results]
         assert all(c >= 0 for c in counts), "All counts should be non-negative"
 
-    def test_transaction_rollback(self, db_config):
+    def test_transaction_rollback(self, db):
         """Test transaction rollback on error."""
-        db = Database(db_config)
-        db.connect()
-
-        try:
-            conn = db.connection
+        conn = db.connection
 
-            # Start transaction
-            conn.autocommit = False
-
-            try:
-                # Insert test data
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO news (source_id, title, description, link, published_at)
-                    VALUES (1, 'Test Title', 'Test Description', 'https://test.com', NOW())
-                """)
-
-                # Simulate error
-                raise Exception("Test error for rollback")
-
-            except Exception:
-                # Rollback transaction
-                conn.rollback()
-                conn.autocommit = True
-
-            # Verify no data was inserted
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM news WHERE title = 'Test Title'")
-            count = cursor.fetchone()[0]
-            assert count == 0, "Transaction was not rolled back properly"
-
-        finally:
-            db.disconnect()
-
-    def test_database_performance(self, db_config):
-        """Test database performance under load."""
-        import time
-
-        db = Database(db_config)
-        db.connect()
+        # The pooled connection is already inside a transaction
 
         try:
-            # Measure simple query performance
-            start_time = time.time()
+            # Insert test data
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO news (source_id, title, description, link, published_at)
+                VALUES (1, 'Test Title', 'Test Description', 'https://test.com', NOW())
+            """)
 
-            for _ in range(10):
-                db.get_news_count_last_hours(hours=1, table_name="news")
+            # Simulate error
+            raise Exception("Test error for rollback")
 
-            end_time = time.time()
-            total_time = end_time - start_time
+        except Exception:
+            # Rollback transaction
+            conn.rollback()
 
-            # Should complete in reasonable time
-            avg_time = total_time / 10
-            assert avg_time < 0.1, f"Query too slow: {avg_time:.3f}s average"
+        # Verify no data was inserted
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM news WHERE title = 'Test Title'")
+        count = cursor.fetchone()[0]
+        assert count == 0, "Transaction was not rolled back properly"
 
-        finally:
-            db.disconnect()
\ No newline at end of file
+    def test_database_performance(self, db, db_config, benchmark):
+        """Test database performance under load."""
+        # Bypass the count cache so every call really reaches PostgreSQL
+        uncached_db = Database(db_config, connection=db.connection, count_cache_ttl=0)
+
+        result = benchmark.pedantic(
+            uncached_db.get_news_count_last_hours,
+            kwargs={"hours": 1, "table_name": "news"},
+            iterations=10,
+            rounds=5,
+            warmup_rounds=2
+        )
+
+        assert result >= 0
+        # Should complete in reasonable time
+        median = benchmark.stats.stats.median
+        assert median < 0.1, f"Query too slow: {median:.3f}s median"
+
+    def test_count_uses_index(self, db):
+        """Test that the recent-news count can be served by idx_news_published_at."""
+        cursor = db.connection.cursor()
+        # The test table is tiny, so forbid seq scans to check the index is usable at all
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("""
+            EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+            SELECT COUNT(*) FROM news
+            WHERE published_at >= now() - interval '1 hour'
+              AND title IS NOT NULL
+              AND title != ''
+        """)
+        plan = cursor.fetchone()[0][0]["Plan"]
+
+        def index_names(node):
+            if "Index Name" in node:
+                yield node["Index Name"]
+            for child in node.get("Plans", []):
+                yield from index_names(child)
+
+        assert "idx_news_published_at" in set(index_names(plan)), plan
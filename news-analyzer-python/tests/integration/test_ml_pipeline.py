@@ -1,11 +1,12 @@
 """Integration tests for the complete ML pipeline."""
 
 import pytest
+import numpy as np
 import psycopg2
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 import time
 
-from src.db import Database
 from src.fetcher import NewsFetcher
 from src.preprocessor import AdvancedTextCleaner
 from src.analyzer import TextVectorizer, NewsClusterer
@@ -13,104 +14,129 @@ from src.narrative import NarrativeBuilder
 from src.cache.redis_cache import RedisCache
 
 
+# Built once per process: timestamps are relative to a single frozen "now",
+# so they stay inside the 24h window the pipeline queries
+FIXED_NOW = datetime.now().replace(microsecond=0)
+
+SAMPLE_NEWS = (
+    {
+        "title": "Президент Путин встретился с министром иностранных дел",
+        "description": "Владимир Путин обсудил международные отношения с главой МИД Сергеем Лавровым",
+        "published_at": FIXED_NOW - timedelta(hours=2)
+    },
+    {
+        "title": "Экономика России показывает рост",
+        "description": "Центробанк сообщил о положительной динамике экономических показателей",
+        "published_at": FIXED_NOW - timedelta(hours=3)
+    },
+    {
+        "title": "Спорт: Россия выиграла золото на Олимпиаде",
+        "description": "Российские спортсмены завоевали золотую медаль в командных соревнованиях",
+        "published_at": FIXED_NOW - timedelta(hours=4)
+    },
+    {
+        "title": "Технологии: Новый смартфон от Samsung",
+        "description": "Компания Samsung представила флагманский смартфон с инновационными функциями",
+        "published_at": FIXED_NOW - timedelta(hours=5)
+    },
+    {
+        "title": "Погода: Теплая весна в Москве",
+        "description": "Синоптики прогнозируют комфортную погоду на ближайшие дни",
+        "published_at": FIXED_NOW - timedelta(hours=6)
+    },
+    {
+        "title": "Политика: Новые санкции против России",
+        "description": "Европейский союз ввел дополнительные ограничительные меры",
+        "published_at": FIXED_NOW - timedelta(hours=7)
+    },
+    {
+        "title": "Экономика: Курс рубля укрепился",
+        "description": "Российская валюта показала рост по отношению к доллару и евро",
+        "published_at": FIXED_NOW - timedelta(hours=8)
+    },
+    {
+        "title": "Спорт: Футбольный клуб выиграл чемпионат",
+        "description": "Московский клуб стал победителем национального первенства",
+        "published_at": FIXED_NOW - timedelta(hours=9)
+    },
+)
+
+
 class TestMLPipelineIntegration:
     """Integration tests for the complete ML pipeline."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.sample_news = [
-            {
-                "title": "Президент Путин встретился с министром иностранных дел",
-                "description": "Владимир Путин обсудил международные отношения с главой МИД Сергеем Лавровым",
-                "published_at": datetime.now() - timedelta(hours=2)
-            },
-            {
-                "title": "Экономика России показывает рост",
-                "description": "Центробанк сообщил о положительной динамике экономических показателей",
-                "published_at": datetime.now() - timedelta(hours=3)
-            },
-            {
-                "title": "Спорт: Россия выиграла золото на Олимпиаде",
-                "description": "Российские спортсмены завоевали золотую медаль в командных соревнованиях",
-                "published_at": datetime.now() - timedelta(hours=4)
-            },
-            {
-                "title": "Технологии: Новый смартфон от Samsung",
-                "description": "Компания Samsung представила флагманский смартфон с инновационными функциями",
-                "published_at": datetime.now() - timedelta(hours=5)
-            },
-            {
-                "title": "Погода: Теплая весна в Москве",
-                "description": "Синоптики прогнозируют комфортную погоду на ближайшие дни",
-                "published_at": datetime.now() - timedelta(hours=6)
-            },
-            {
-                "title": "Политика: Новые санкции против России",
-                "description": "Европейский союз ввел дополнительные ограничительные меры",
-                "published_at": datetime.now() - timedelta(hours=7)
-            },
-            {
-                "title": "Экономика: Курс рубля укрепился",
-                "description": "Российская валюта показала рост по отношению к доллару и евро",
-                "published_at": datetime.now() - timedelta(hours=8)
-            },
-            {
-                "title": "Спорт: Футбольный клуб выиграл чемпионат",
-                "description": "Московский клуб стал победителем национального первенства",
-                "published_at": datetime.now() - timedelta(hours=9)
-            }
-        ]
+    sample_news = SAMPLE_NEWS
 
-    def test_full_ml_pipeline_integration(self, db_config, redis_config):
+    @pytest.fixture(scope="class")
+    def vectorized_sample(self):
+        """Sample texts vectorized once and shared by clustering and narrative checks."""
+        texts = [f"{item['title']} {item['description']}" for item in SAMPLE_NEWS]
+        vectorizer = TextVectorizer(max_features=50)
+        vectors = vectorizer.fit_transform(texts)
+        return texts, vectorizer, vectors
+
+    @pytest.fixture(scope="class")
+    def redis_cache(self, redis_config):
+        """One RedisCache (and its connection pool) shared by the caching helpers."""
+        return RedisCache(
+            host=redis_config["host"],
+            port=redis_config["port"]
+        )
+
+    def test_full_ml_pipeline_integration(self, db, redis_cache, vectorized_sample):
         """Test the complete ML pipeline from database to narratives."""
-        # Setup database
-        db = Database(db_config)
-        db.connect()
-
-        try:
-            # Create test data
-            self._setup_test_data(db)
-
-            # Test components
-            self._test_data_fetching(db)
-            self._test_text_preprocessing()
-            self._test_vectorization()
-            self._test_clustering()
-            self._test_narrative_building()
-            self._test_caching_integration(redis_config)
-            self._test_pipeline_integration(db, redis_config)
-
-        finally:
-            db.disconnect()
+        # Create test data
+        self._setup_test_data(db)
+
+        # Test components
+        self._test_data_fetching(db)
+        self._test_text_preprocessing()
+        self._test_vectorization()
+        self._test_clustering(vectorized_sample)
+        self._test_narrative_building(vectorized_sample)
+        self._test_caching_integration(redis_cache)
+        self._test_pipeline_integration(db, redis_cache)
+
+    def test_cache_stats_drop_expired_entries(self, redis_cache):
+        """Test that index entries of expired keys are not counted."""
+        before = redis_cache.get_cache_stats()["clusters"]
+
+        redis_cache.set_clustering_result("expiring_hash", {"min_cluster_size": 2}, {"n_clusters": 1},
+                                          ttl_seconds=1)
+        assert redis_cache.get_cache_stats()["clusters"] == before + 1
+
+        # Индекс хранит время истечения с точностью до секунды по часам сервера
+        time.sleep(2.1)
+        assert redis_cache.get_cache_stats()["clusters"] == before
 
     def _setup_test_data(self, db):
         """Set up test data in database."""
         # Create news table
         db.ensure_analysis_table_exists()
 
-        # Insert test news
-        for news_item in self.sample_news:
-            db.save_news(
-                source_id=1,
-                title=news_item["title"],
-                description=news_item["description"],
-                link=f"https://example.com/news/{hash(news_item['title'])}",
-                published_at=news_item["published_at"]
+        # Load test news with a single COPY; stable links keep the rows deterministic
+        rows = [
+            (
+                1,
+                news_item["title"],
+                news_item["description"],
+                f"https://example.com/news/test-{i}",
+                news_item["published_at"]
             )
+            for i, news_item in enumerate(self.sample_news)
+        ]
+        db.copy_news(rows)
 
         # Verify data
-        conn = db.connection
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM news")
-        count = cursor.fetchone()[0]
+        count = db.get_news_count_last_hours(hours=24)
         assert count >= len(self.sample_news)
 
     def _test_data_fetching(self, db):
         """Test data fetching from database."""
-        fetcher = NewsFetcher(db, type('Config', (), {
-            'time_window_hours': 24,
-            'db_table': 'news'
-        })())
+        fetcher = NewsFetcher(db, SimpleNamespace(
+            time_window_hours=24,
+            db_table='news'
+        ))
 
         news_items = fetcher.fetch_recent_news()
         assert len(news_items) >= len(self.sample_news)
@@ -130,10 +156,12 @@ class TestMLPipelineIntegration:
             max_word_length=15
         )
 
-        for news_item in self.sample_news[:3]:  # Test first 3 items
-            text = f"{news_item['title']} {news_item['description']}"
-            processed = cleaner.preprocess(text)
+        processed_texts = cleaner.preprocess_batch([
+            f"{news_item['title']} {news_item['description']}"
+            for news_item in self.sample_news[:3]  # Test first 3 items
+        ])
 
+        for processed in processed_texts:
             # Basic checks
             assert isinstance(processed, str)
             assert len(processed) > 0
@@ -155,21 +183,14 @@ class TestMLPipelineIntegration:
         texts = [f"{item['title']} {item['description']}" for item in self.sample_news]
         vectors = vectorizer.fit_transform(texts)
 
-        assert isinstance(vectors, list)
-        assert len(vectors) == len(texts)
-        assert len(vectors[0]) <= 100  # max_features
-
-        # Check vector properties
-        for vector in vectors:
-            assert len(vector) == len(vectors[0])  # Same length
-            assert all(isinstance(v, float) for v in vector)
+        assert isinstance(vectors, np.ndarray)
+        assert vectors.dtype == np.float32
+        assert vectors.shape == (len(texts), len(vectorizer.get_feature_names()))
+        assert vectors.shape[1] <= 100  # max_features
 
-    def _test_clustering(self):
+    def _test_clustering(self, vectorized_sample):
         """Test news clustering."""
-        # Prepare data
-        vectorizer = TextVectorizer(max_features=50)
-        texts = [f"{item['title']} {item['description']}" for item in self.sample_news]
-        vectors = vectorizer.fit_transform(texts)
+        _, _, vectors = vectorized_sample
 
         # Test clustering
         clusterer = NewsClusterer(
@@ -191,12 +212,9 @@ class TestMLPipelineIntegration:
             assert 'overall_quality_score' in quality_metrics
             assert 0 <= quality_metrics['overall_quality_score'] <= 1
 
-    def _test_narrative_building(self):
+    def _test_narrative_building(self, vectorized_sample):
         """Test narrative building."""
-        # Prepare test data
-        vectorizer = TextVectorizer(max_features=50)
-        texts = [f"{item['title']} {item['description']}" for item in self.sample_news]
-        vectors = vectorizer.fit_transform(texts)
+        texts, vectorizer, vectors = vectorized_sample
 
         clusterer = NewsClusterer(min_cluster_size=2)
         labels, n_clusters, _, _ = clusterer.fit_predict(vectors)
@@ -204,11 +222,11 @@ class TestMLPipelineIntegration:
         # Create mock news items
         news_items = []
         for i, text in enumerate(texts):
-            item = type('NewsItem', (), {
-                'id': i,
-                'title': self.sample_news[i]['title'],
-                'description': self.sample_news[i]['description']
-            })()
+            item = SimpleNamespace(
+                id=i,
+                title=self.sample_news[i]['title'],
+                description=self.sample_news[i]['description']
+            )
             news_items.append(item)
 
         # Test narrative building
@@ -233,13 +251,8 @@ class TestMLPipelineIntegration:
             assert isinstance(narrative['keywords'], list)
             assert narrative['size'] > 0
 
-    def _test_caching_integration(self, redis_config):
+    def _test_caching_integration(self, cache):
         """Test Redis caching integration."""
-        cache = RedisCache(
-            host=redis_config["host"],
-            port=redis_config["port"]
-        )
-
         # Test basic operations
         test_texts = ["Тестовый текст для кэширования"]
         test_vectors = [[0.1, 0.2, 0.3]]
@@ -248,8 +261,8 @@ class TestMLPipelineIntegration:
         cache.set_vectorized_texts(test_texts, test_vectors, ttl_seconds=60)
         cached_vectors = cache.get_vectorized_texts(test_texts)
 
-        if cached_vectors:  # Redis may not be available in all environments
-            assert cached_vectors == test_vectors
+        if cached_vectors is not None:  # Redis may not be available in all environments
+            np.testing.assert_allclose(cached_vectors, np.asarray(test_vectors, dtype=np.float32))
 
         # Test clustering result caching
         test_params = {"min_cluster_size": 5}
@@ -261,32 +274,20 @@ class TestMLPipelineIntegration:
         if cached_result:  # Redis may not be available in all environments
             assert cached_result == test_result
 
-    def _test_pipeline_integration(self, db, redis_config):
+    def _test_pipeline_integration(self, db, cache):
         """Test complete pipeline integration."""
-        try:
-            cache = RedisCache(
-                host=redis_config["host"],
-                port=redis_config["port"]
-            )
-        except:
-            cache = None
-
         # Simulate the full pipeline
-        fetcher = NewsFetcher(db, type('Config', (), {
-            'time_window_hours': 24,
-            'db_table': 'news'
-        })())
+        fetcher = NewsFetcher(db, SimpleNamespace(
+            time_window_hours=24,
+            db_table='news'
+        ))
 
         news_items = fetcher.fetch_recent_news()
         assert len(news_items) >= len(self.sample_news)
 
         # Preprocessing
         cleaner = AdvancedTextCleaner(use_lemmatization=False)
-        processed_texts = []
-        for item in news_items:
-            text = f"{item.title} {item.description}"
-            processed = cleaner.preprocess(text)
-            processed_texts.append(processed)
+        processed_texts = cleaner.preprocess_batch([f"{item.title} {item.description}" for item in news_items])
 
         # Vectorization with caching
         vectorizer = TextVectorizer(max_features=50)
@@ -298,7 +299,7 @@ class TestMLPipelineIntegration:
 
         # Cache vectors
         if cache and texts_hash:
-            cache.set_vectorized_texts(processed_texts, vectors, ttl_seconds=300)
+            cache.set_vectorized_texts(processed_texts, vectors, ttl_seconds=300, texts_hash=texts_hash)
 
         # Clustering
         clusterer = NewsClusterer(min_cluster_size=2, evaluate_quality=True)
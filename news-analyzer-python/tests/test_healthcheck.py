@@ -1,20 +1,33 @@
 """Unit tests for healthcheck script."""
 
+import ast
 import pytest
 import subprocess
 import sys
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 
+@pytest.fixture(scope="session")
+def healthcheck_path():
+    """Path to the healthcheck script."""
+    return Path(__file__).parent.parent / "healthcheck.py"
+
+
+@pytest.fixture(scope="session")
+def healthcheck_ast(healthcheck_path):
+    """Healthcheck script parsed once per session."""
+    return ast.parse(healthcheck_path.read_text())
+
+
 class TestHealthcheck:
     """Test cases for healthcheck script."""
 
-    def test_healthcheck_script_exists(self):
+    def test_healthcheck_script_exists(self, healthcheck_path):
         """Test that healthcheck script exists and is executable."""
         import os
-        from pathlib import Path
 
-        script_path = Path(__file__).parent.parent / "healthcheck.py"
+        script_path = healthcheck_path
         assert script_path.exists(), "healthcheck.py should exist"
 
         # Check if executable (on Unix systems)
@@ -52,22 +65,13 @@ class TestHealthcheck:
         # In real execution, this would work, but we're just testing the script exists
         # The actual test would require proper mocking of database and config
 
-    def test_healthcheck_main_function_structure(self):
+    def test_healthcheck_main_function_structure(self, healthcheck_ast):
         """Test that healthcheck main function has proper structure."""
-        import ast
-        from pathlib import Path
-
-        script_path = Path(__file__).parent.parent / "healthcheck.py"
-
-        with open(script_path, 'r') as f:
-            tree = ast.parse(f.read())
-
-        # Check that main function exists
-        main_found = False
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) and node.name == 'main':
-                main_found = True
-                break
+        # Check that main function exists (top level is enough, no full tree walk)
+        main_found = any(
+            isinstance(node, ast.FunctionDef) and node.name == 'main'
+            for node in healthcheck_ast.body
+        )
 
         assert main_found, "healthcheck.py should have a main() function"
 
@@ -76,13 +80,12 @@ class TestHealthcheck:
 
     @patch('sys.exit')
     @patch('sys.path')
-    def test_healthcheck_main_exception_handling(self, mock_path, mock_exit):
+    def test_healthcheck_main_exception_handling(self, mock_path, mock_exit, healthcheck_path):
         """Test that main function handles exceptions properly."""
         # Import the script as a module
         import importlib.util
-        from pathlib import Path
 
-        script_path = Path(__file__).parent.parent / "healthcheck.py"
+        script_path = healthcheck_path
         spec = importlib.util.spec_from_file_location("healthcheck", script_path)
         healthcheck_module = importlib.util.module_from_spec(spec)
 
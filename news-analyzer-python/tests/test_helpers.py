@@ -0,0 +1,49 @@
+"""Unit tests for helpers module."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.utils.helpers import ensure_dir, format_datetime
+
+
+class TestEnsureDir:
+    """Test cases for ensure_dir."""
+
+    def test_creates_nested_dir(self, tmp_path):
+        """Test that missing parent directories are created."""
+        path = tmp_path / "reports" / "daily"
+
+        result = ensure_dir(str(path))
+
+        assert result == path
+        assert path.is_dir()
+
+    def test_recreates_deleted_dir(self, tmp_path):
+        """Test that a directory removed between calls is created again."""
+        path = tmp_path / "logs"
+        ensure_dir(path)
+        path.rmdir()
+
+        ensure_dir(path)
+
+        assert path.is_dir()
+
+
+
+class TestFormatDatetime:
+    """Test cases for format_datetime."""
+
+    @pytest.mark.parametrize("dt", [
+        datetime(2024, 1, 2, 3, 4, 5),
+        datetime(2024, 1, 2, 3, 4, 5, 678901),
+        datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=3))),
+    ], ids=["naive", "microseconds", "aware"])
+    def test_default_format_matches_strftime(self, dt):
+        """Test that the isoformat fast path gives the strftime result."""
+        assert format_datetime(dt) == dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    def test_custom_format(self):
+        """Test that other formats go through strftime."""
+        dt = datetime(2024, 1, 2, 3, 4, 5, 678901)
+        assert format_datetime(dt, "%d.%m.%Y %f") == "02.01.2024 678901"
@@ -0,0 +1,94 @@
+"""Unit tests for logger module."""
+
+import json
+import logging
+import shutil
+from unittest.mock import patch
+
+from src.utils.logger import JSONFormatter, StructuredLogger, setup_logger
+
+
+class _ListHandler(logging.Handler):
+    """Collects formatted records in memory."""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class TestStructuredLogger:
+    """Test cases for StructuredLogger class."""
+
+    def setup_method(self):
+        """Set up a logger writing JSON into a list."""
+        self.handler = _ListHandler()
+        self.handler.setFormatter(JSONFormatter())
+        base = logging.getLogger("test_structured_logger")
+        base.handlers = [self.handler]
+        base.setLevel(logging.DEBUG)
+        base.propagate = False
+        self.logger = StructuredLogger(base)
+
+    def test_fields_in_json(self):
+        """Test keyword fields end up in the formatted JSON."""
+        self.logger.info("Redis cache initialized", host="localhost", port=6379)
+
+        assert len(self.handler.lines) == 1
+        entry = json.loads(self.handler.lines[0])
+        assert entry["message"] == "Redis cache initialized"
+        assert entry["level"] == "INFO"
+        assert entry["host"] == "localhost"
+        assert entry["port"] == 6379
+
+    def test_format_args(self):
+        """Test positional args are applied as %-format arguments."""
+        self.logger.warning("Processed %d of %d", 3, 5, stage="vectorize")
+
+        entry = json.loads(self.handler.lines[0])
+        assert entry["message"] == "Processed 3 of 5"
+        assert entry["stage"] == "vectorize"
+
+    def test_level_filtered(self):
+        """Test records below the logger level are not emitted."""
+        self.logger.logger.setLevel(logging.INFO)
+        self.logger.debug("hidden", key="value")
+
+        assert self.handler.lines == []
+
+
+class TestSetupLogger:
+    """Test cases for setup_logger."""
+
+    def test_recreates_deleted_log_dir(self, tmp_path):
+        """Test that a log directory removed after the first setup is created again."""
+        log_dir = tmp_path / "logs"
+        setup_logger("test_setup_logger", log_dir=log_dir, json_format=False)
+        assert log_dir.is_dir()
+        shutil.rmtree(log_dir)
+
+        setup_logger("test_setup_logger", log_level="DEBUG", log_dir=log_dir, json_format=False)
+
+        assert log_dir.is_dir()
+
+    def test_text_format_keeps_stack_info(self):
+        """Test that stack_info still yields a stack when the caller lookup is skipped."""
+        logger = setup_logger("test_stack_info", log_to_file=False, json_format=False)
+        records = []
+
+        with patch.object(logger.handlers[0], "enqueue", records.append):
+            logger.error("with stack", stack_info=True)
+            logger.error("without stack")
+
+        assert "test_text_format_keeps_stack_info" in records[0].stack_info
+        assert records[1].stack_info is None
+
+    def test_process_wide_flags_untouched(self):
+        """Test that setup_logger does not change logging flags for other loggers."""
+        setup_logger("test_flags", log_to_file=False, json_format=False)
+
+        assert logging.logThreads
+        assert logging.logProcesses
+        assert logging.logMultiprocessing
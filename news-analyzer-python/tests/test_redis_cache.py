@@ -3,8 +3,12 @@
 import pytest
 from unittest.mock import patch, MagicMock
 import json
+import msgpack
+import pickle
+import numpy as np
+import redis
 
-from src.cache.redis_cache import RedisCache
+from src.cache.redis_cache import RedisCache, _get_pool
 
 
 class TestRedisCache:
@@ -26,8 +30,72 @@ class TestRedisCache:
         mock_redis.return_value = mock_redis_instance
 
         cache = RedisCache()
-        # При ошибке подключения client должен быть None
-        assert cache.client is None
+        # Подключение ленивое: конструктор не обращается к серверу
+        mock_redis_instance.ping.assert_not_called()
+        # Ошибка подключения проявляется при первой проверке
+        assert cache.health_check() is False
+        assert cache.get_narratives("hash", {"param": "value"}) is None
+        mock_redis_instance.get.assert_not_called()
+
+    def test_instances_share_connection_pool(self):
+        """Test that caches for the same server reuse one connection pool."""
+        with patch('redis.Redis') as mock_redis:
+            RedisCache(host="localhost", port=6379, db=0)
+            RedisCache(host="localhost", port=6379, db=0)
+
+        first_pool, second_pool = (call.kwargs["connection_pool"] for call in mock_redis.call_args_list)
+        assert first_pool is second_pool
+        assert first_pool is _get_pool("localhost", 6379, 0, None)
+        assert first_pool is not _get_pool("localhost", 6379, 1, None)
+
+    def test_localhost_uses_tcp_without_configured_socket(self):
+        """Test that an existing socket file is not picked up unless configured."""
+        with patch('os.path.exists', return_value=True), \
+                patch('src.cache.redis_cache.REDIS_SOCKET_PATH', None), \
+                patch('redis.Redis') as mock_redis:
+            RedisCache(host="localhost", port=6379, db=0)
+
+        pool = mock_redis.call_args.kwargs["connection_pool"]
+        assert "path" not in pool.connection_kwargs
+        assert pool.connection_kwargs["host"] == "localhost"
+
+    def test_configured_unix_socket(self):
+        """Test that REDIS_SOCKET_PATH selects a socket connection."""
+        with patch('src.cache.redis_cache.REDIS_SOCKET_PATH', "/run/redis/redis.sock"), \
+                patch('redis.Redis') as mock_redis:
+            cache = RedisCache(host="localhost", port=6379, db=0)
+
+        pool = mock_redis.call_args.kwargs["connection_pool"]
+        assert pool.connection_kwargs["path"] == "/run/redis/redis.sock"
+        assert cache.client is mock_redis.return_value
+
+    def test_unix_socket_falls_back_to_tcp(self):
+        """Test that a failing socket connection falls back to TCP."""
+        unix_client, tcp_client = MagicMock(), MagicMock()
+        unix_client.ping.side_effect = redis.ConnectionError("No such file")
+
+        with patch('redis.Redis', side_effect=[unix_client, tcp_client]) as mock_redis:
+            cache = RedisCache(host="localhost", port=6379, db=0, unix_socket_path="/tmp/missing.sock")
+            assert cache.health_check() is True
+
+        unix_pool, tcp_pool = (call.kwargs["connection_pool"] for call in mock_redis.call_args_list)
+        assert unix_pool.connection_kwargs["path"] == "/tmp/missing.sock"
+        assert tcp_pool.connection_kwargs["host"] == "localhost"
+        assert cache.client is tcp_client
+
+    def test_health_check_result_is_cached(self):
+        """Test that health_check pings at most once per TTL window."""
+        cache = RedisCache()
+        cache.client = MagicMock()
+
+        with patch('src.cache.redis_cache.time.monotonic', side_effect=[100.0, 101.0, 106.0]):
+            assert cache.health_check() is True
+            assert cache.health_check() is True
+            assert cache.client.ping.call_count == 1
+            cache.client.ping.side_effect = redis.ConnectionError("down")
+            assert cache.health_check() is False
+
+        assert cache.client.ping.call_count == 2
 
     def test_hash_texts(self):
         """Test text hashing function."""
@@ -44,6 +112,9 @@ class TestRedisCache:
         hash3 = self.cache._hash_texts(different_texts)
         assert hash1 != hash3
 
+        # Граница между текстами учитывается в хэше
+        assert self.cache._hash_texts(["ab", "c"]) != self.cache._hash_texts(["a", "bc"])
+
     def test_make_key(self):
         """Test key generation."""
         prefix = "test"
@@ -72,6 +143,133 @@ class TestRedisCache:
         # Не должно вызвать ошибку
         cache.set_vectorized_texts(["test"], [[1.0, 2.0]], 3600)
 
+    def test_set_vectorized_texts_reuses_given_hash(self):
+        """Test that a precomputed texts hash is used instead of rehashing."""
+        cache = RedisCache()
+        cache.client = MagicMock()
+
+        with patch.object(cache, '_hash_texts') as mock_hash:
+            cache.set_vectorized_texts(["test"], [[1.0, 2.0]], 3600, texts_hash="abcd1234")
+
+        mock_hash.assert_not_called()
+        _, numkeys, key, index_key, _, ttl = cache.client.evalsha.call_args[0]
+        assert key == "news_analyzer:vectors:abcd1234"
+        # Ключ регистрируется в индексе категории тем же скриптом
+        assert (numkeys, index_key, ttl) == (2, "news_analyzer:expiry_index:vectors", 3600)
+
+    def test_vectorized_texts_roundtrip_as_raw_bytes(self):
+        """Test that numpy matrices are stored as a small header plus raw bytes, not pickle."""
+        cache = RedisCache()
+        cache.client = MagicMock()
+        vectors = np.arange(6, dtype=np.float32).reshape(2, 3)
+
+        cache.set_vectorized_texts(["a", "b"], vectors, 3600, texts_hash="abcd1234")
+
+        payload = cache.client.evalsha.call_args[0][4]
+        raw = cache._decompress(payload)
+        assert raw.startswith(b"NAV1")
+        assert raw.endswith(vectors.tobytes())
+
+        cache.client.get.return_value = payload
+        restored = cache.get_vectorized_texts(["a", "b"], texts_hash="abcd1234")
+        assert restored.dtype == np.float32
+        assert np.array_equal(restored, vectors)
+
+    @pytest.mark.parametrize("vectors", [
+        np.zeros((0, 5), dtype=np.float32),
+        np.arange(5, dtype=np.int64),
+        np.asfortranarray(np.arange(6, dtype=np.float64).reshape(2, 3)),
+    ], ids=["empty", "int64", "fortran"])
+    def test_pack_vectors_roundtrip(self, vectors):
+        """Test that dtype, shape and values survive the raw-bytes round trip."""
+        restored = self.cache._unpack_vectors(self.cache._pack_vectors(vectors))
+
+        assert restored.dtype == vectors.dtype
+        assert restored.shape == vectors.shape
+        assert np.array_equal(restored, vectors)
+
+    def test_pack_vectors_from_list(self):
+        """Test that nested lists are stored as numeric arrays."""
+        vectors = [[1.0, 2.0], [3.0, 4.0]]
+        restored = self.cache._unpack_vectors(self.cache._pack_vectors(vectors))
+        assert np.array_equal(restored, np.array(vectors))
+
+    def test_pack_vectors_rejects_objects(self):
+        """Test that object arrays are not cached."""
+        with pytest.raises(TypeError):
+            self.cache._pack_vectors(np.array([{"a": 1}], dtype=object))
+
+    def test_unpack_vectors_rejects_unknown_format(self):
+        """Test that payloads without the vectors header are never deserialized."""
+        payload = self.cache._compress(pickle.dumps([[1.0, 2.0]]))
+        with pytest.raises(ValueError):
+            self.cache._unpack_vectors(payload)
+
+    def test_get_vectors_per_text_recomputes_only_misses(self):
+        """Test that one MGET classifies hits and only misses are recomputed."""
+        cache = RedisCache()
+        cache.client = MagicMock()
+        payload = cache._pack_vectors(np.array([1.0, 2.0], dtype=np.float32))
+        cache.client.mget.return_value = [payload, None, payload]
+        compute = MagicMock(return_value=[np.array([3.0, 4.0], dtype=np.float32)])
+
+        vectors = cache.get_vectors_per_text(["первый", "второй", "третий"], compute, ttl_seconds=60)
+
+        cache.client.mget.assert_called_once()
+        assert len(cache.client.mget.call_args[0][0]) == 3
+        compute.assert_called_once_with(["второй"])
+        assert [v.tolist() for v in vectors] == [[1.0, 2.0], [3.0, 4.0], [1.0, 2.0]]
+        # Промах записывается одним пакетом: значение и индекс text_vectors - одним скриптом
+        pipe = cache.client.pipeline.return_value.__enter__.return_value
+        pipe.evalsha.assert_called_once()
+        _, numkeys, key, index_key, _, ttl = pipe.evalsha.call_args[0]
+        assert key == cache.client.mget.call_args[0][0][1]
+        assert (numkeys, index_key, ttl) == (2, "news_analyzer:expiry_index:text_vectors", 60)
+        pipe.setex.assert_not_called()
+        pipe.sadd.assert_not_called()
+        pipe.execute.assert_called_once()
+
+    @pytest.mark.parametrize("method, args, writes", [
+        ("set_vectorized_texts", (["test"], np.ones((1, 2), dtype=np.float32)), 1),
+        ("set_clustering_result", ("hash", {"param": "value"}, {"n_clusters": 1}), 1),
+        ("set_narratives", ("hash", {"param": "value"}, [{"theme": "Политика"}]), 1),
+        ("set_analysis_bundle", ("hash", {"param": "value"}, {"n_clusters": 1},
+                                 {"top_n": 5}, [{"theme": "Политика"}]), 2),
+    ], ids=["vectors", "clusters", "narratives", "bundle"])
+    def test_setters_write_value_and_ttl_in_one_command(self, method, args, writes):
+        """Test that every setter stores the value and its TTL atomically, without a separate EXPIRE."""
+        cache = RedisCache()
+        cache.client = MagicMock()
+        pipe = cache.client.pipeline.return_value.__enter__.return_value
+
+        getattr(cache, method)(*args, ttl_seconds=3600)
+
+        # Значение, TTL и запись в индекс уходят одним EVALSHA на каждый ключ
+        calls = cache.client.evalsha.call_args_list + pipe.evalsha.call_args_list
+        assert len(calls) == writes
+        for call in calls:
+            sha, numkeys, key, index_key, _, ttl = call[0]
+            assert sha == cache._store_script.sha
+            assert numkeys == 2
+            assert index_key.startswith("news_analyzer:expiry_index:")
+            assert ttl == 3600
+        for client in (cache.client, pipe):
+            client.expire.assert_not_called()
+            client.set.assert_not_called()
+            client.setex.assert_not_called()
+
+    def test_store_script_reloaded_after_noscript(self):
+        """Test that the store script is loaded once when the server does not know its SHA."""
+        cache = RedisCache()
+        cache.client = MagicMock()
+        cache.client.evalsha.side_effect = [redis.exceptions.NoScriptError("NOSCRIPT"), 1]
+        cache.client.script_load.return_value = cache._store_script.sha
+
+        cache.set_narratives("hash", {"param": "value"}, [{"theme": "Политика"}], ttl_seconds=60)
+
+        cache.client.script_load.assert_called_once_with(cache._store_script.script)
+        assert cache.client.evalsha.call_count == 2
+
     @patch.object(RedisCache, 'health_check')
     def test_get_clustering_result_no_cache(self, mock_health):
         """Test getting clustering result when Redis is unavailable."""
@@ -110,6 +308,52 @@ class TestRedisCache:
         # Не должно вызвать ошибку
         cache.set_narratives("hash", {"param": "value"}, [{"narrative": "data"}], 1800)
 
+    def test_get_analysis_bundle_single_round_trip(self):
+        """Test that clustering result and narratives are fetched in one pipeline execution."""
+        cache = RedisCache()
+        cache.client = MagicMock()
+        clusters = {"labels": [0, 0, 1], "n_clusters": 2}
+        narratives = [{"theme": "Политика", "size": 2}]
+        pipe = cache.client.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [cache._encode(clusters), cache._encode(narratives)]
+
+        result = cache.get_analysis_bundle("abcd1234", {"min_cluster_size": 2}, {"top_n": 5})
+
+        assert result == (clusters, narratives)
+        pipe.execute.assert_called_once()
+        assert pipe.get.call_count == 2
+        cache.client.get.assert_not_called()
+        # Ключ кластеров совпадает с ключом get_clustering_result
+        assert pipe.get.call_args_list[0][0][0] == cache._clusters_key("abcd1234", {"min_cluster_size": 2})
+
+    def test_get_analysis_bundle_partial_hit(self):
+        """Test that a missing half of the bundle comes back as None."""
+        cache = RedisCache()
+        cache.client = MagicMock()
+        pipe = cache.client.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [cache._encode({"n_clusters": 1}), None]
+
+        assert cache.get_analysis_bundle("abcd1234", {}, {}) == ({"n_clusters": 1}, None)
+
+    def test_set_analysis_bundle_atomic(self):
+        """Test that both halves of the bundle are written in one MULTI/EXEC."""
+        cache = RedisCache()
+        cache.client = MagicMock()
+
+        cache.set_analysis_bundle("abcd1234", {"min_cluster_size": 2}, {"n_clusters": 1},
+                                  {"top_n": 5}, [{"theme": "Экономика"}], ttl_seconds=60)
+
+        cache.client.pipeline.assert_called_once_with(transaction=True)
+        pipe = cache.client.pipeline.return_value.__enter__.return_value
+        # Значения и записи индексов уходят скриптом записи внутри одного MULTI/EXEC
+        assert pipe.evalsha.call_count == 2
+        index_keys = [call[0][3] for call in pipe.evalsha.call_args_list]
+        assert index_keys == ["news_analyzer:expiry_index:clusters", "news_analyzer:expiry_index:narratives"]
+        assert all(call[0][5] == 60 for call in pipe.evalsha.call_args_list)
+        pipe.setex.assert_not_called()
+        pipe.sadd.assert_not_called()
+        pipe.execute.assert_called_once()
+
     def test_invalidate_analysis_cache_no_cache(self):
         """Test cache invalidation when Redis is unavailable."""
         cache = RedisCache()
@@ -135,6 +379,7 @@ class TestRedisCache:
 
         expected_stats = {
             "vectors": 0,
+            "text_vectors": 0,
             "clusters": 0,
             "narratives": 0,
             "total": 0
@@ -149,51 +394,73 @@ class TestRedisCache:
         result = cache.health_check()
         assert result is False
 
-    @patch('redis.Redis.keys')
-    @patch('redis.Redis.delete')
-    def test_invalidate_analysis_cache_with_cache(self, mock_delete, mock_keys):
+    def test_invalidate_analysis_cache_with_cache(self):
         """Test cache invalidation when Redis is available."""
-        mock_keys.return_value = [b"key1", b"key2"]
-
         cache = RedisCache()
-        cache.invalidate_analysis_cache(["test text"])
+        cache.client = MagicMock()
+        cache.client.scan_iter.side_effect = [iter([b"key1"]), iter([]), iter([b"key2"])]
 
-        # Проверяем, что keys был вызван
-        assert mock_keys.called
-        # Проверяем, что delete был вызван с ключами
-        mock_delete.assert_called_once_with(b"key1", b"key2")
+        cache.invalidate_analysis_cache(["test text"])
 
-    @patch('redis.Redis.keys')
-    def test_clear_all_cache_with_cache(self, mock_keys):
+        # Проверяем, что ключи ищутся через SCAN по трем шаблонам, а не через KEYS
+        assert cache.client.scan_iter.call_count == 3
+        for call in cache.client.scan_iter.call_args_list:
+            assert call.kwargs["count"] == 1000
+        cache.client.keys.assert_not_called()
+        # Проверяем, что delete был вызван один раз со всеми ключами, а индексы почищены
+        pipe = cache.client.pipeline.return_value.__enter__.return_value
+        text_key = cache._make_key("text_vectors", cache._hash_texts(["test text"]))
+        pipe.delete.assert_called_once_with(b"key1", b"key2", text_key)
+        pipe.zrem.assert_any_call("news_analyzer:expiry_index:vectors", b"key1")
+        pipe.zrem.assert_any_call("news_analyzer:expiry_index:narratives", b"key2")
+        # Векторы отдельных текстов удаляются вместе с записью в своем индексе
+        pipe.zrem.assert_any_call("news_analyzer:expiry_index:text_vectors", text_key)
+        assert pipe.zrem.call_count == 3
+        pipe.execute.assert_called_once()
+
+    def test_clear_all_cache_with_cache(self):
         """Test clearing all cache when Redis is available."""
-        mock_keys.return_value = [b"key1", b"key2", b"key3"]
-
         cache = RedisCache()
+        cache.client = MagicMock()
+        cache.client.scan_iter.return_value = iter([b"key1", b"key2", b"key3"])
+
         cache.clear_all_cache()
 
-        # Проверяем, что keys был вызван для паттерна news_analyzer:*
-        mock_keys.assert_called_once_with("news_analyzer:*")
+        # Проверяем, что scan_iter был вызван для паттерна news_analyzer:*
+        cache.client.scan_iter.assert_called_once_with(match="news_analyzer:*", count=1000)
+        cache.client.keys.assert_not_called()
+        cache.client.delete.assert_called_once_with(b"key1", b"key2", b"key3")
 
-    @patch('redis.Redis.keys')
-    def test_get_cache_stats_with_cache(self, mock_keys):
+    def test_get_cache_stats_with_cache(self):
         """Test getting cache stats when Redis is available."""
-        # Имитируем наличие ключей разных типов
-        mock_keys.side_effect = [
-            [b"news_analyzer:vectors:key1"],  # 1 vector key
-            [b"news_analyzer:clusters:key2", b"news_analyzer:clusters:key3"],  # 2 cluster keys
-            [b"news_analyzer:narratives:key4", b"news_analyzer:narratives:key5", b"news_analyzer:narratives:key6"]  # 3 narrative keys
-        ]
-
         cache = RedisCache()
+        cache.client = MagicMock()
+        # Имитируем размеры индексов разных типов
+        sizes = {
+            "news_analyzer:expiry_index:vectors": 1,
+            "news_analyzer:expiry_index:text_vectors": 4,
+            "news_analyzer:expiry_index:clusters": 2,
+            "news_analyzer:expiry_index:narratives": 3
+        }
+        cache.client.evalsha.side_effect = lambda sha, numkeys, *keys: [sizes[key] for key in keys]
+
         stats = cache.get_cache_stats()
 
         expected_stats = {
             "vectors": 1,
+            "text_vectors": 4,
             "clusters": 2,
             "narratives": 3,
-            "total": 6
+            "total": 10
         }
         assert stats == expected_stats
+        # Все индексы чистятся от истекших ключей и считаются одним скриптом
+        cache.client.evalsha.assert_called_once()
+        assert cache.client.evalsha.call_args[0][0] == cache._count_script.sha
+        cache.client.scard.assert_not_called()
+        # Статистика не обходит пространство ключей
+        cache.client.scan_iter.assert_not_called()
+        cache.client.keys.assert_not_called()
 
     @patch('redis.Redis.ping')
     def test_health_check_with_cache(self, mock_ping):
@@ -217,7 +484,7 @@ class TestRedisCache:
         assert result is False
 
     def test_json_serialization_clustering_result(self):
-        """Test JSON serialization/deserialization of clustering results."""
+        """Test serialization/deserialization of clustering results."""
         test_data = {
             "labels": [0, 0, 1, 1, -1],
             "n_clusters": 2,
@@ -226,15 +493,20 @@ class TestRedisCache:
         }
 
         # Тестируем сериализацию
-        json_str = json.dumps(test_data, ensure_ascii=False)
+        packed = msgpack.packb(test_data, use_bin_type=True)
 
         # Тестируем десериализацию
-        parsed_data = json.loads(json_str)
+        parsed_data = msgpack.unpackb(packed, raw=False)
 
         assert parsed_data == test_data
+        assert len(packed) < len(json.dumps(test_data, ensure_ascii=False).encode('utf-8'))
+
+        # Кодек кэша дает тот же результат, включая numpy-метки
+        numpy_data = dict(test_data, labels=np.array(test_data["labels"]), n_clusters=np.int64(2))
+        assert self.cache._decode(self.cache._encode(numpy_data)) == test_data
 
     def test_json_serialization_narratives(self):
-        """Test JSON serialization/deserialization of narratives."""
+        """Test serialization/deserialization of narratives."""
         test_narratives = [
             {
                 "theme": "Политика",
@@ -251,9 +523,43 @@ class TestRedisCache:
         ]
 
         # Тестируем сериализацию
-        json_str = json.dumps(test_narratives, ensure_ascii=False)
+        packed = msgpack.packb(test_narratives, use_bin_type=True)
 
         # Тестируем десериализацию
-        parsed_narratives = json.loads(json_str)
+        parsed_narratives = msgpack.unpackb(packed, raw=False)
+
+        assert parsed_narratives == test_narratives
+        assert self.cache._decode(self.cache._encode(test_narratives)) == test_narratives
+
+        # JSON остается доступен для отладки
+        json_cache = RedisCache(codec="json")
+        assert json_cache._decode(json_cache._encode(test_narratives)) == test_narratives
+
+    @pytest.mark.parametrize("orjson_available", [True, False])
+    def test_json_codec_with_and_without_orjson(self, orjson_available):
+        """Test that the JSON codec gives the same result with orjson and stdlib json."""
+        test_data = {"labels": np.array([0, 1, -1]), "n_clusters": np.int64(2), "theme": "Политика"}
+
+        json_cache = RedisCache(codec="json")
+        with patch('src.cache.redis_cache.ORJSON_AVAILABLE', orjson_available):
+            raw = json_cache._encode(test_data)
+            restored = json_cache._decode(raw)
+
+        assert restored == {"labels": [0, 1, -1], "n_clusters": 2, "theme": "Политика"}
+        assert "Политика".encode("utf-8") in json_cache._decompress(raw)
+
+    def test_zstd_compression_with_legacy_fallback(self):
+        """Test that payloads are zstd-compressed and uncompressed values still decode."""
+        test_narratives = [{"theme": "Политика", "keywords": ["президент"] * 50, "size": 15}]
+
+        raw = self.cache._encode(test_narratives)
+        assert raw.startswith(b"\x28\xb5\x2f\xfd")
+        assert len(raw) < len(msgpack.packb(test_narratives, use_bin_type=True))
+        assert self.cache._decode(raw) == test_narratives
+
+        # Значения, записанные до включения сжатия, читаются без изменений
+        legacy = msgpack.packb(test_narratives, use_bin_type=True)
+        assert self.cache._decode(legacy) == test_narratives
 
-        assert parsed_narratives == test_narratives
\ No newline at end of file
+        plain_cache = RedisCache(compress=False)
+        assert plain_cache._encode(test_narratives) == legacy
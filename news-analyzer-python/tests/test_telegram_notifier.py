@@ -0,0 +1,185 @@
+"""Unit tests for telegram_notifier module."""
+
+import json
+from unittest.mock import patch, MagicMock
+
+import pytest
+import requests
+
+from src.reporter.telegram_notifier import (
+    TelegramNotifier,
+    _PART_HEADER_RESERVE,
+    _REPORT_CACHE_SIZE,
+    _SEP_EQ,
+    _SEP_MINUS,
+)
+
+
+def _write_report(path, total_news=1):
+    """Write a minimal report JSON and return its path."""
+    report = {
+        "analysis_date": "2024-01-15T10:00:00",
+        "total_news": total_news,
+        "narratives_count": 0,
+        "narratives": []
+    }
+    path.write_text(json.dumps(report), encoding="utf-8")
+    return path
+
+
+def _response(status_code=200, body=None):
+    """Build a mocked Telegram API response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = body or {"ok": True, "result": {"message_id": 1}}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    return response
+
+
+class TestReportCache:
+    """Test cases for the loaded report cache."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.notifier = TelegramNotifier("test-token")
+
+    @pytest.fixture
+    def json_load(self):
+        """Count report file reads (stdlib json branch)."""
+        with patch("src.reporter.telegram_notifier.ORJSON_AVAILABLE", False), \
+                patch("src.reporter.telegram_notifier.json.load", wraps=json.load) as load:
+            yield load
+
+    def test_same_path_read_once(self, tmp_path, json_load):
+        """Test that loading an unchanged report twice reads the file once."""
+        report_path = _write_report(tmp_path / "report.json", total_news=42)
+
+        first = self.notifier._load_report(report_path)
+        second = self.notifier._load_report(report_path)
+
+        assert json_load.call_count == 1
+        assert second[0] is first[0]
+        assert second[1] == first[1]
+        assert first[0]["total_news"] == 42
+
+    def test_oldest_report_evicted(self, tmp_path, json_load):
+        """Test that the oldest report is evicted once the cache is full."""
+        paths = [_write_report(tmp_path / f"report_{i}.json") for i in range(_REPORT_CACHE_SIZE + 1)]
+
+        for path in paths:
+            self.notifier._load_report(path)
+
+        assert json_load.call_count == _REPORT_CACHE_SIZE + 1
+        cached_paths = {key[0] for key in self.notifier._report_cache}
+        assert len(cached_paths) == _REPORT_CACHE_SIZE
+        assert str(paths[0]) not in cached_paths
+        assert cached_paths == {str(path) for path in paths[1:]}
+
+        # Вытесненный отчет читается с диска заново, остальные - из кэша
+        self.notifier._load_report(paths[-1])
+        assert json_load.call_count == _REPORT_CACHE_SIZE + 1
+        self.notifier._load_report(paths[0])
+        assert json_load.call_count == _REPORT_CACHE_SIZE + 2
+
+
+class TestCopyFanOut:
+    """Test cases for send_message_to_all_via_copy."""
+
+    SOURCE_CHAT = 100
+
+    def setup_method(self):
+        """Set up a notifier with a mocked HTTP session."""
+        self.notifier = TelegramNotifier("test-token")
+        self.notifier._delay_between_messages = 0
+        self.notifier.session = MagicMock()
+        # Ответ по методу API и получателю: {(метод, chat_id): код}
+        self.statuses = {}
+        self.notifier.session.post.side_effect = self._post
+
+    @staticmethod
+    def _payload(kwargs):
+        """Request body sent either as JSON bytes (orjson) or via json=."""
+        return kwargs["json"] if "json" in kwargs else json.loads(kwargs["data"])
+
+    def _post(self, url, **kwargs):
+        """Fake Session.post: answers by API method and chat_id."""
+        payload = self._payload(kwargs)
+        method = url.rsplit("/", 1)[-1]
+        status = self.statuses.get((method, payload["chat_id"]), 200)
+        return _response(status, {"ok": True, "result": {"message_id": 7}})
+
+    def _calls(self):
+        """(method, chat_id) of every request sent so far."""
+        calls = []
+        for call in self.notifier.session.post.call_args_list:
+            payload = self._payload(call.kwargs)
+            calls.append((call.args[0].rsplit("/", 1)[-1], payload["chat_id"]))
+        return calls
+
+    def test_blocked_chat_skipped_next_time(self):
+        """Test that a 403 on copy marks the chat blocked and later sends skip it."""
+        self.statuses[("copyMessage", 1)] = 403
+
+        results = self.notifier.send_message_to_all_via_copy(self.SOURCE_CHAT, [1, 2], "Отчет")
+
+        assert results == {1: False, 2: True}
+        assert 1 in self.notifier._blocked_chats
+        # Заблокированному чату текст напрямую не отправляется
+        assert ("sendMessage", 1) not in self._calls()
+
+        self.notifier.session.post.reset_mock()
+        results = self.notifier.send_message_to_all_via_copy(self.SOURCE_CHAT, [1, 2], "Отчет")
+
+        assert results == {1: False, 2: True}
+        assert self._calls() == [("sendMessage", self.SOURCE_CHAT), ("copyMessage", 2)]
+
+    def test_copy_failure_falls_back_to_send(self):
+        """Test that a failed copy is replaced by a plain sendMessage."""
+        self.statuses[("copyMessage", 1)] = 400
+
+        results = self.notifier.send_message_to_all_via_copy(self.SOURCE_CHAT, [1], "Отчет")
+
+        assert results == {1: True}
+        assert self._calls() == [
+            ("sendMessage", self.SOURCE_CHAT),
+            ("copyMessage", 1),
+            ("sendMessage", 1),
+        ]
+        assert not self.notifier._blocked_chats
+
+
+# Лимит части в send_summary и бюджет текста части без заголовка "Часть i/N"
+_SUMMARY_PART_LIMIT = 1800
+_PART_BUDGET = _SUMMARY_PART_LIMIT - _PART_HEADER_RESERVE
+
+
+class TestSplitParts:
+    """Test cases for _count_split_parts and _iter_split."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.notifier = TelegramNotifier("test-token")
+
+    @pytest.mark.parametrize("text", [
+        "",
+        "короткая строка",
+        "x" * _PART_BUDGET,
+        "x" * (_PART_BUDGET - 1),
+        "x" * (_PART_BUDGET * 3 + 5),
+        "\n".join(["строка " * 20] * 60),
+        "\n".join([_SEP_EQ, "ТЕМА #1", _SEP_MINUS, "y" * 5000, "", _SEP_EQ] * 4),
+        "\n" * 3000,
+        "начало\n" + "z" * (_PART_BUDGET - 1) + "\nконец\n",
+    ], ids=[
+        "empty", "short", "exact_budget", "budget_minus_one", "long_single_line",
+        "many_lines", "separators_and_long_lines", "only_newlines", "line_fills_part",
+    ])
+    def test_count_matches_parts(self, text):
+        """Test that the precounted N matches the parts produced, and parts fit with the header."""
+        parts = list(self.notifier._iter_split(text, _PART_BUDGET))
+
+        assert self.notifier._count_split_parts(text, _PART_BUDGET) == len(parts)
+        for i, part in enumerate(parts, 1):
+            assert len(part) <= _PART_BUDGET
+            assert len(f"Часть {i}/{len(parts)}\n\n" + part) <= _SUMMARY_PART_LIMIT
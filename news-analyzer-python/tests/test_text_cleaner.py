@@ -3,7 +3,7 @@
 import pytest
 from unittest.mock import patch, MagicMock
 
-from src.preprocessor.text_cleaner import TextCleaner
+from src.preprocessor.text_cleaner import TextCleaner, AdvancedTextCleaner
 
 
 class TestTextCleaner:
@@ -149,6 +149,38 @@ class TestTextCleaner:
         # (зависит от NLTK stopwords)
         assert isinstance(tokens, list)
 
+    def test_tokenize_keeps_whole_words(self):
+        """Test that length limits drop whole words instead of splitting them."""
+        cleaner = TextCleaner(min_word_length=2, max_word_length=10)
+        tokens = cleaner.tokenize("сеть 5g оченьдлинноеслово 2024 стоп-кран")
+
+        assert "5g" in tokens
+        assert "стоп-кран" in tokens
+        assert "2024" not in tokens
+        assert not any(token in "оченьдлинноеслово" for token in tokens)
+
+    def test_preprocess_matches_clean_and_tokenize(self):
+        """Test that the single-pass preprocess equals clean_text followed by tokenize."""
+        texts = [
+            "Президент, «Газпром» и 5G-сети: https://example.com/a-b — итоги 2024!",
+            "Пишите на editor@example.com_или\tзвоните… C-3PO стоп-кран",
+            "café über ÉТО дополнительное СЛОВО",
+        ]
+
+        for text in texts:
+            expected = " ".join(self.cleaner.tokenize(self.cleaner.clean_text(text)))
+            assert self.cleaner.preprocess(text) == expected
+
+    def test_base_stopwords_shared_between_instances(self):
+        """Test that the base stopword set is built once and shared."""
+        first = TextCleaner()
+        second = TextCleaner()
+
+        assert first.stopwords is second.stopwords
+        assert isinstance(first.stopwords, frozenset)
+        assert "слово" in self.cleaner.stopwords
+        assert "слово" not in first.stopwords
+
     def test_custom_stopwords_integration(self):
         """Test integration of custom stopwords."""
         text = "Это дополнительное слово для теста"
@@ -156,4 +188,42 @@ class TestTextCleaner:
 
         # Проверяем, что кастомные стоп-слова удалены
         assert "дополнительное" not in result.split()
-        assert "слово" not in result.split()
\ No newline at end of file
+        assert "слово" not in result.split()
+
+
+class TestAdvancedTextCleanerBatch:
+    """Test cases for AdvancedTextCleaner.preprocess_batch."""
+
+    def test_preprocess_batch_matches_preprocess(self):
+        """Batch preprocessing returns the same result as per-text calls."""
+        cleaner = AdvancedTextCleaner(use_lemmatization=False)
+        texts = [
+            "Президент встретился с министром <b>иностранных</b> дел",
+            "",
+            "Экономика показывает рост: https://example.com/news 2024",
+        ]
+
+        assert cleaner.preprocess_batch(texts) == [cleaner.preprocess(t) for t in texts]
+
+    def test_regex_tokenizer_matches_nltk_path(self):
+        """Test that the default regex tokenizer agrees with the opt-in NLTK path."""
+        text = "Президент подписал закон о бюджете, а правительство — поддержало его!"
+        regex_cleaner = AdvancedTextCleaner(use_lemmatization=False)
+
+        with patch('src.preprocessor.text_cleaner.word_tokenize', side_effect=lambda t, language: t.split()) as mock_nltk:
+            nltk_cleaner = AdvancedTextCleaner(use_lemmatization=False, use_nltk=True)
+            assert regex_cleaner.preprocess(text) == nltk_cleaner.preprocess(text)
+
+        mock_nltk.assert_called_once()
+
+    def test_preprocess_batch_reuses_lemmas(self):
+        """Each distinct word is lemmatized once per batch."""
+        cleaner = AdvancedTextCleaner(use_lemmatization=False)
+        cleaner.use_lemmatization = True
+        cleaner.morph = MagicMock()
+
+        with patch.object(cleaner, "_lemmatize", side_effect=lambda w: w[:4]) as lemmatize:
+            result = cleaner.preprocess_batch(["рост экономики", "рост экономики страны"])
+
+        assert result == ["рост экон", "рост экон стра"]
+        assert lemmatize.call_count == 3
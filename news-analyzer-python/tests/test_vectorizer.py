@@ -2,29 +2,31 @@
 
 import pytest
 import numpy as np
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 
 from src.analyzer.vectorizer import TextVectorizer
 
 
+@pytest.fixture(scope="module")
+def vectorizer():
+    """Shared vectorizer for tests that only call fit_transform (it refits on every call)."""
+    return TextVectorizer(
+        max_features=100,
+        min_df=1,
+        max_df=1.0
+    )
+
+
 class TestTextVectorizer:
     """Test cases for TextVectorizer class."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.vectorizer = TextVectorizer(
-            max_features=100,
-            min_df=1,
-            max_df=1.0
-        )
-
-    def test_init(self):
+    def test_init(self, vectorizer):
         """Test TextVectorizer initialization."""
-        assert self.vectorizer.max_features == 100
-        assert self.vectorizer.min_df == 1
-        assert self.vectorizer.max_df == 1.0
+        assert vectorizer.max_features == 100
+        assert vectorizer.min_df == 1
+        assert vectorizer.max_df == 1.0
 
-    def test_fit_transform_basic(self):
+    def test_fit_transform_basic(self, vectorizer):
         """Test basic fit_transform functionality."""
         texts = [
             "Это первый тестовый текст",
@@ -32,51 +34,118 @@ class TestTextVectorizer:
             "Третий текст для тестирования"
         ]
 
-        vectors = self.vectorizer.fit_transform(texts)
+        vectors = vectorizer.fit_transform(texts)
 
         # Проверяем тип результата
-        assert isinstance(vectors, list)
+        assert isinstance(vectors, np.ndarray)
+        assert vectors.dtype == np.float32
+        assert vectorizer.vectorizer.dtype == np.float32
         assert len(vectors) == len(texts)
 
         # Проверяем, что векторы имеют правильную длину
-        if vectors and len(vectors) > 0:
+        if len(vectors) > 0:
             vector_length = len(vectors[0])
             assert vector_length <= 100  # max_features
             # Проверяем, что все векторы одинаковой длины
             assert all(len(v) == vector_length for v in vectors)
 
-    def test_fit_transform_empty_texts(self):
+    def test_fit_transform_empty_texts(self, vectorizer):
         """Test fit_transform with empty texts."""
         texts = ["", "   ", "ещё текст"]
-        vectors = self.vectorizer.fit_transform(texts)
+        vectors = vectorizer.fit_transform(texts)
 
         # Проверяем, что результат не пустой
-        assert isinstance(vectors, list)
+        assert isinstance(vectors, np.ndarray)
         assert len(vectors) == len(texts)
 
-    def test_fit_transform_single_text(self):
+    def test_fit_transform_single_text(self, vectorizer):
         """Test fit_transform with single text."""
         texts = ["Один единственный текст для тестирования"]
-        vectors = self.vectorizer.fit_transform(texts)
+        vectors = vectorizer.fit_transform(texts)
 
-        assert isinstance(vectors, list)
+        assert isinstance(vectors, np.ndarray)
         assert len(vectors) == 1
         assert len(vectors[0]) > 0
 
-    def test_fit_transform_identical_texts(self):
+    def test_fit_transform_identical_texts(self, vectorizer):
         """Test fit_transform with identical texts."""
         texts = ["Одинаковый текст"] * 3
-        vectors = self.vectorizer.fit_transform(texts)
+        vectors = vectorizer.fit_transform(texts)
 
-        assert isinstance(vectors, list)
+        assert isinstance(vectors, np.ndarray)
         assert len(vectors) == 3
 
         # Все векторы должны быть одинаковыми
-        if vectors and len(vectors) > 1:
+        if len(vectors) > 1:
             assert np.allclose(vectors[0], vectors[1])
             assert np.allclose(vectors[1], vectors[2])
 
-    def test_fit_transform_no_common_words(self):
+    def test_fit_transform_uses_cache_hit(self):
+        """Test that a cached matrix is returned without running TF-IDF."""
+        cached = np.ones((3, 4), dtype=np.float32)
+        cache = MagicMock()
+        cache._hash_texts.return_value = "abcd1234"
+        cache.get_vectorized_texts.return_value = cached
+        vectorizer = TextVectorizer(max_features=100, min_df=1, max_df=1.0, cache=cache)
+
+        with patch('src.analyzer.vectorizer.TfidfVectorizer') as mock_tfidf:
+            vectors = vectorizer.fit_transform(["Одинаковый текст"] * 3)
+
+        mock_tfidf.assert_not_called()
+        assert np.array_equal(vectors, cached)
+        texts_hash = cache.get_vectorized_texts.call_args.kwargs["texts_hash"]
+        assert texts_hash.startswith("abcd1234_")
+        assert vectorizer.from_cache is True
+        cache.set_vectorized_texts.assert_not_called()
+
+    def test_fit_transform_stores_cache_miss(self):
+        """Test that a computed matrix is stored under a params-aware key."""
+        cache = MagicMock()
+        cache._hash_texts.return_value = "abcd1234"
+        cache.get_vectorized_texts.return_value = None
+        vectorizer = TextVectorizer(max_features=100, min_df=1, max_df=1.0, cache=cache, cache_ttl=60)
+
+        vectors = vectorizer.fit_transform(["Одинаковый текст"] * 3)
+
+        args, kwargs = cache.set_vectorized_texts.call_args
+        assert args[1] is vectors
+        assert kwargs["ttl_seconds"] == 60
+        assert kwargs["texts_hash"] == cache.get_vectorized_texts.call_args.kwargs["texts_hash"]
+        assert vectorizer.from_cache is False
+        # Другие параметры векторизации дают другой ключ
+        other = TextVectorizer(max_features=50, min_df=1, max_df=1.0)
+        assert other._params_hash() != vectorizer._params_hash()
+
+    def test_cache_hit_resets_previous_fit(self):
+        """Test that a cache hit does not keep the vocabulary of an earlier fit."""
+        cache = MagicMock()
+        cache._hash_texts.return_value = "abcd1234"
+        cache.get_vectorized_texts.return_value = None
+        vectorizer = TextVectorizer(max_features=100, min_df=1, max_df=1.0, cache=cache)
+        vectorizer.fit_transform(["первый текст", "второй текст"])
+        assert len(vectorizer.get_feature_names()) > 0
+
+        cache.get_vectorized_texts.return_value = np.ones((2, 4), dtype=np.float32)
+        vectorizer.fit_transform(["другой текст", "еще текст"])
+
+        assert vectorizer.vectorizer is None
+        with pytest.raises(RuntimeError):
+            vectorizer.get_feature_names()
+
+    def test_fit_transform_reuses_texts_hash(self):
+        """Test that a precomputed texts hash is combined with the params hash."""
+        cache = MagicMock()
+        cache.get_vectorized_texts.return_value = np.ones((2, 2), dtype=np.float32)
+        vectorizer = TextVectorizer(max_features=100, min_df=1, max_df=1.0, cache=cache)
+
+        vectorizer.fit_transform(["a", "b"], texts_hash="abcd1234")
+
+        cache._hash_texts.assert_not_called()
+        expected = vectorizer.cache_key(["a", "b"], "abcd1234")
+        assert expected == f"abcd1234_{vectorizer._params_hash()}"
+        assert cache.get_vectorized_texts.call_args.kwargs["texts_hash"] == expected
+
+    def test_fit_transform_no_common_words(self, vectorizer):
         """Test fit_transform with texts having no common words."""
         texts = [
             "Кошка сидит на крыше",
@@ -84,13 +153,13 @@ class TestTextVectorizer:
             "Птица летит в небе"
         ]
 
-        vectors = self.vectorizer.fit_transform(texts)
+        vectors = vectorizer.fit_transform(texts)
 
-        assert isinstance(vectors, list)
+        assert isinstance(vectors, np.ndarray)
         assert len(vectors) == 3
 
         # Векторы должны быть различными
-        if vectors and len(vectors) > 1:
+        if len(vectors) > 1:
             assert not np.allclose(vectors[0], vectors[1])
 
     def test_max_features_limit(self):
@@ -105,9 +174,23 @@ class TestTextVectorizer:
         vectors = vectorizer.fit_transform(texts)
 
         # Проверяем, что размерность не превышает max_features
-        if vectors and len(vectors) > 0:
+        if len(vectors) > 0:
             assert len(vectors[0]) <= 50
 
+    def test_hashing_fixed_width(self):
+        """Test that the hashing mode yields exactly max_features float32 columns."""
+        texts = [" ".join(f"word_{i}_{j}" for j in range(50)) for i in range(10)]
+
+        vectorizer = TextVectorizer(max_features=100, use_hashing=True)
+        vectors = vectorizer.fit_transform(texts)
+
+        assert isinstance(vectors, np.ndarray)
+        assert vectors.dtype == np.float32
+        assert vectors.shape == (10, 100)
+        assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+        with pytest.raises(RuntimeError):
+            vectorizer.get_feature_names()
+
     def test_min_df_filtering(self):
         """Test min_df parameter filtering."""
         texts = [
@@ -121,7 +204,7 @@ class TestTextVectorizer:
         vectors = vectorizer.fit_transform(texts)
 
         # "обычное" и "слово" должны быть включены, "редкое" и "уникальное" - нет
-        assert isinstance(vectors, list)
+        assert isinstance(vectors, np.ndarray)
         assert len(vectors) == 3
 
     def test_max_df_filtering(self):
@@ -138,20 +221,23 @@ class TestTextVectorizer:
         vectors = vectorizer.fit_transform(texts)
 
         # "частое", "слово", "повсюду" встречаются во всех документах (100% > 80%), должны быть отфильтрованы
-        assert isinstance(vectors, list)
+        assert isinstance(vectors, np.ndarray)
         assert len(vectors) == 4
 
-    def test_vector_values_range(self):
+    @pytest.mark.parametrize("texts", [
+        ["Это тестовый текст для проверки значений векторов"],
+        ["Кошка сидит на крыше", "Собака бежит по улице", "Кошка бежит по крыше"],
+    ], ids=["single", "several"])
+    def test_vector_values_range(self, vectorizer, texts):
         """Test that vector values are in expected range."""
-        texts = ["Это тестовый текст для проверки значений векторов"]
-        vectors = self.vectorizer.fit_transform(texts)
+        vectors = vectorizer.fit_transform(texts)
 
-        if vectors and len(vectors) > 0:
+        if len(vectors) > 0:
             vector = vectors[0]
             # TF-IDF значения обычно неотрицательные
             assert all(v >= 0 for v in vector)
 
-    def test_vector_sparsity(self):
+    def test_vector_sparsity(self, vectorizer):
         """Test vector sparsity (most values should be zero)."""
         texts = [
             "Кошка сидит на крыше",
@@ -159,9 +245,9 @@ class TestTextVectorizer:
             "Птица летит в небе"
         ]
 
-        vectors = self.vectorizer.fit_transform(texts)
+        vectors = vectorizer.fit_transform(texts)
 
-        if vectors and len(vectors) > 0:
+        if len(vectors) > 0:
             vector = vectors[0]
             # Подсчитываем количество ненулевых значений
             non_zero_count = sum(1 for v in vector if v > 1e-10)
@@ -171,13 +257,13 @@ class TestTextVectorizer:
             assert sparsity_ratio < 0.5  # Менее 50% ненулевых значений
 
     @patch('sklearn.feature_extraction.text.TfidfVectorizer.fit_transform')
-    def test_sklearn_error_handling(self, mock_fit_transform):
+    def test_sklearn_error_handling(self, mock_fit_transform, vectorizer):
         """Test error handling when sklearn fails."""
         mock_fit_transform.side_effect = Exception("sklearn error")
 
         texts = ["Тестовый текст"]
         with pytest.raises(Exception):
-            self.vectorizer.fit_transform(texts)
+            vectorizer.fit_transform(texts)
 
     def test_memory_efficiency(self):
         """Test memory efficiency with large vocabulary."""
@@ -191,7 +277,7 @@ class TestTextVectorizer:
         vectors = vectorizer.fit_transform(texts)
 
         # Проверяем, что векторы созданы и имеют правильный размер
-        assert isinstance(vectors, list)
+        assert isinstance(vectors, np.ndarray)
         assert len(vectors) == 10
-        if vectors and len(vectors[0]) > 0:
+        if len(vectors[0]) > 0:
             assert len(vectors[0]) <= 100  # Не превышает max_features
\ No newline at end of file